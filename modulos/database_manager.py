@@ -90,6 +90,12 @@ class DatabaseManager:
                 cursor.execute("ALTER TABLE slots ADD COLUMN ml_model_path TEXT")
             except sqlite3.OperationalError:
                 pass  # Coluna já existe
+                
+            # Formato das amostras de treinamento ('jpg' ou 'png' sem perdas)
+            try:
+                cursor.execute("ALTER TABLE slots ADD COLUMN sample_format TEXT DEFAULT 'jpg'")
+            except sqlite3.OperationalError:
+                pass  # Coluna já existe
             
             # Índices para melhor performance
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_slots_modelo_id ON slots(modelo_id)")
@@ -237,7 +243,7 @@ class DatabaseManager:
                        detection_threshold, correlation_threshold,
                        template_method, scale_tolerance, template_path,
                        detection_method, shape, rotation, ok_threshold,
-                       use_ml, ml_model_path
+                       use_ml, ml_model_path, sample_format
                 FROM slots WHERE modelo_id = ?
                 ORDER BY slot_id
             """, (modelo_id,))
@@ -275,7 +281,8 @@ class DatabaseManager:
                     'rotation': row[19] if len(row) > 19 and row[19] is not None else 0,
                     'ok_threshold': row[20] if len(row) > 20 and row[20] is not None else 70,
                     'use_ml': bool(row[21]) if len(row) > 21 and row[21] is not None else False,
-                    'ml_model_path': ml_model_path
+                    'ml_model_path': ml_model_path,
+                    'sample_format': row[23] if len(row) > 23 and row[23] else 'jpg'
                 }
                 slots.append(slot)
             
@@ -634,8 +641,8 @@ class DatabaseManager:
                 detection_threshold, correlation_threshold,
                 template_method, scale_tolerance, template_path,
                 detection_method, shape, rotation, ok_threshold,
-                use_ml, ml_model_path
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                use_ml, ml_model_path, sample_format
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """, (
             modelo_id,
             slot_data['id'],
@@ -658,7 +665,8 @@ class DatabaseManager:
             slot_data.get('rotation', 0),
             slot_data.get('ok_threshold', 70),
             1 if slot_data.get('use_ml', False) else 0,
-            ml_model_path
+            ml_model_path,
+            slot_data.get('sample_format', 'jpg')
         ))
     
     def _update_slot_data(self, cursor, modelo_id: int, slot_data: Dict):
@@ -683,7 +691,7 @@ class DatabaseManager:
                 detection_threshold = ?, correlation_threshold = ?,
                 template_method = ?, scale_tolerance = ?, template_path = ?,
                 detection_method = ?, shape = ?, rotation = ?, ok_threshold = ?,
-                use_ml = ?, ml_model_path = ?
+                use_ml = ?, ml_model_path = ?, sample_format = ?
             WHERE modelo_id = ? AND slot_id = ?
         """, (
             slot_data['tipo'],
@@ -706,6 +714,7 @@ class DatabaseManager:
             slot_data.get('ok_threshold', 70),
             1 if slot_data.get('use_ml', False) else 0,
             ml_model_path,
+            slot_data.get('sample_format', 'jpg'),
             modelo_id,
             slot_data['id']
         ))
@@ -318,6 +318,32 @@ class MLSlotClassifier:
             self.logger.error(f"Erro durante predição: {e}")
             return 'NG', 0.0
     
+    def predict_batch(self, roi_images: List[np.ndarray]) -> np.ndarray:
+        """Classifica várias imagens ROI com uma única chamada ao classificador.
+        
+        Args:
+            roi_images: Lista de imagens das regiões de interesse
+            
+        Returns:
+            Array com 1 (OK) ou 0 (NG) para cada imagem
+        """
+        predictions = np.zeros(len(roi_images), dtype=int)
+        try:
+            if not self.is_trained:
+                raise ValueError("Modelo não foi treinado")
+            
+            features = [self.extract_features(roi) for roi in roi_images]
+            # Imagens sem características ficam como NG, igual a predict()
+            valid = [i for i, f in enumerate(features) if f.size > 0]
+            if valid:
+                X_scaled = self.scaler.transform(np.vstack([features[i] for i in valid]))
+                predictions[valid] = self.classifier.predict(X_scaled)
+            
+        except Exception as e:
+            self.logger.error(f"Erro durante predição em lote: {e}")
+        
+        return predictions
+    
     def save_model(self, filepath: str) -> bool:
         """Salva o modelo treinado em arquivo.
         
@@ -1,15 +1,48 @@
 import cv2
 import numpy as np
+from scipy.special import entr
 from pathlib import Path
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import (LEFT, BOTH, DISABLED, NORMAL, X, Y, BOTTOM, RIGHT, HORIZONTAL, VERTICAL, NW, CENTER)
 from tkinter import (Canvas, filedialog, messagebox, simpledialog, Toplevel, StringVar, Text,
                      colorchooser, DoubleVar)
 from tkinter.ttk import Combobox
+from tkinter import font as tkfont
 from PIL import Image, ImageTk
 from datetime import datetime
 import os
+import copy
+import stat
+import hashlib
 import time
+import logging
+import queue
+import threading
+import weakref
+from functools import lru_cache, partial
+from concurrent.futures import ThreadPoolExecutor
+
+# xxHash é opcional: sem ele a impressão digital usa os bytes da subamostra
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+# PyTurboJPEG é opcional: sem ele (ou sem a libturbojpeg) as amostras JPEG são lidas pelo OpenCV
+try:
+    from turbojpeg import TurboJPEG
+    _turbo_jpeg = TurboJPEG()
+except Exception:
+    _turbo_jpeg = None
+
+# Numba é opcional: sem ele as funções decoradas rodam em Python puro
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
 
 # Importa módulos do sistema de banco de dados
 try:
@@ -32,6 +65,8 @@ except ImportError:
         from modulos.utils import load_style_config, save_style_config, apply_style_config, get_style_config_path, get_color, get_colors_group
         from modulos.ml_classifier import MLSlotClassifier
 
+logger = logging.getLogger(__name__)
+
 # ---------- parâmetros globais ------------------------------------------------
 # Caminho para a pasta de modelos na raiz do projeto
 # Usa caminhos relativos para permitir portabilidade
@@ -65,14 +100,62 @@ TEMPLATE_DIR = get_template_dir()
 THR_CORR = 0.1  # Limiar para template matching (clips)
 MIN_PX = 10      # Contagem mínima de pixels para template matching (clips)
 
+# Fator de conversão de logaritmo natural para log2
+LOG2_E = 1.4426950408889634
+
+# Parâmetros da pirâmide do template matching (busca coarse-to-fine)
+PYR_MIN_TEMPLATE = 32   # Menor lado (px) do template no topo da pirâmide
+PYR_MAX_LEVELS = 3      # Máximo de reduções (pyrDown) aplicadas
+PYR_REFINE_RADIUS = 2   # Vizinhança (px) refinada em cada nível mais fino
+SCALE_EARLY_EXIT_MARGIN = 0.05  # Folga acima do % para OK que dispensa testar as outras escalas
+
+# Métodos de template matching aceitos em slot_data['template_method']
+TEMPLATE_METHODS = {
+    'TM_CCOEFF_NORMED': cv2.TM_CCOEFF_NORMED,
+    'TM_CCORR_NORMED': cv2.TM_CCORR_NORMED,
+    'TM_SQDIFF_NORMED': cv2.TM_SQDIFF_NORMED
+}
+
+# Pesos dos scores combinados de cada método de detecção
+HISTOGRAM_WEIGHTS = (0.5, 0.3, 0.2)   # entropia, distribuição, intensidade
+CONTOUR_WEIGHTS = (0.4, 0.3, 0.3)     # área, contagem, complexidade
+COMPARISON_WEIGHTS = (0.5, 0.3, 0.2)  # SSIM, diferença absoluta, histograma
+MAX_SQUARED_DIFF = 255 ** 2           # Maior erro quadrático possível em uint8
+
+# Parâmetros do SSIM (mesmos padrões do skimage: janela uniforme 7x7, K1=0.01, K2=0.03)
+SSIM_WIN_SIZE = 7
+SSIM_C1 = (0.01 * 255) ** 2
+SSIM_C2 = (0.03 * 255) ** 2
+
 # Parâmetros do Canvas e Preview
 PREVIEW_W = 1200  # Largura máxima do canvas para exibição inicial (aumentada)
 PREVIEW_H = 900  # Altura máxima do canvas para exibição inicial (aumentada)
 
+# Miniaturas do histórico de treinamento
+THUMB_SIZE = (100, 100)     # Tamanho (w, h) das miniaturas OK/NG
+THUMB_DIR_NAME = ".thumbs"  # Subpasta de samples_dir com as miniaturas persistidas
+HISTORY_ROW_HEIGHT = 120    # Altura fixa (px) de cada linha do histórico virtualizado
+
+# Prévias reduzidas da imagem de treinamento
+PREVIEW_SIZE_STEP = 64          # Tamanho do canvas arredondado (px) para reaproveitar prévias
+PREVIEW_CACHE_MAX_ENTRIES = 4   # Tamanhos de canvas mantidos por imagem
+
 # Parâmetros ORB para registro de imagem
 ORB_FEATURES = 5000
 ORB_SCALE_FACTOR = 1.2
 ORB_N_LEVELS = 8
+ORB_RATIO_TEST = 0.75  # Razão de Lowe para filtrar matches ambíguos
+ORB_MAX_MATCHES = 500  # Máximo de matches (os de menor distância) usados na homografia
+ORB_MAX_DIM = 1000     # Lado maior (px) da imagem reduzida usada para detectar o ORB
+
+# Parâmetros do cache de imagem de teste (dHash + rastreamento LK)
+DHASH_SIZE = 32             # Grade do dHash (32x32 = 1024 bits)
+DHASH_MAX_DISTANCE = 64     # Distância de Hamming máxima para rastrear em vez de re-detectar
+LK_MIN_TRACKED = 20         # Mínimo de pontos rastreados para aceitar a homografia
+
+# Estimador robusto de homografia: MAGSAC++ (OpenCV >= 4.5), senão RANSAC clássico
+HOMOGRAPHY_METHOD = getattr(cv2, 'USAC_MAGSAC', cv2.RANSAC)
+HOMOGRAPHY_MAX_ITERS = 1000 if HOMOGRAPHY_METHOD != cv2.RANSAC else 2000
 
 # Cores são agora carregadas do arquivo de configuração centralizado
 # Veja config/style_config.json para personalizar as cores
@@ -83,6 +166,36 @@ STYLE_CONFIG_PATH = get_style_config_path()
 
 # ---------- utilidades --------------------------------------------------------
 
+# Backend de captura que abriu a câmera no Windows (descoberto na primeira abertura e
+# reutilizado em todas as aberturas seguintes, para que um mesmo dispositivo nunca
+# seja aberto por dois backends diferentes)
+_windows_camera_backend = None
+
+
+def open_windows_camera(camera_index):
+    """
+    Abre a câmera no Windows tentando primeiro o backend que já funcionou; na primeira
+    abertura testa DirectShow (respeita CAP_PROP_BUFFERSIZE=1, do qual a captura em
+    segundo plano depende) e, se falhar, Media Foundation. Retorna o VideoCapture
+    aberto ou None.
+    """
+    global _windows_camera_backend
+    backends = (cv2.CAP_DSHOW, cv2.CAP_MSMF)
+    if _windows_camera_backend is not None:
+        backends = (_windows_camera_backend,) + tuple(b for b in backends if b != _windows_camera_backend)
+    
+    for backend in backends:
+        start = time.perf_counter()
+        cap = cv2.VideoCapture(camera_index, backend)
+        if cap.isOpened():
+            if _windows_camera_backend != backend:
+                _windows_camera_backend = backend
+                print(f"Câmera {camera_index} aberta com {cap.getBackendName()} em {time.perf_counter() - start:.2f}s")
+            return cap
+        cap.release()
+    return None
+
+
 def detect_cameras(max_cameras=5, callback=None):
     """
     Detecta webcams disponíveis no sistema.
@@ -93,34 +206,42 @@ def detect_cameras(max_cameras=5, callback=None):
         max_cameras: Número máximo de câmeras para testar
         callback: Função opcional a ser chamada após detecção com a lista de câmeras
     """
-    available_cameras = []
-    
     # Detecta o sistema operacional
     import platform
     is_windows = platform.system() == 'Windows'
     
-    for i in range(max_cameras):
+    def _probe(i):
+        """Testa a câmera de índice i. Retorna o índice se funcional, senão None."""
         try:
-            # Usa DirectShow no Windows para evitar erros do obsensor
+            # No Windows usa o mesmo backend das demais aberturas (evita erros do obsensor)
             # No Raspberry Pi, usa a API padrão
             if is_windows:
-                cap = cv2.VideoCapture(i, cv2.CAP_DSHOW)
+                cap = open_windows_camera(i)
+                if cap is None:
+                    return None
             else:
                 cap = cv2.VideoCapture(i)
                 
             cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1920)
             cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 1080)
             
+            found = None
             if cap is not None and cap.isOpened():
                 # Testa se consegue ler um frame
                 ret, frame = cap.read()
                 if ret and frame is not None and frame.size > 0:
-                    available_cameras.append(i)
+                    found = i
                 cap.release()
+            return found
         except Exception as e:
             # Silencia erros de câmeras não encontradas
             print(f"Erro ao testar câmera {i}: {e}")
-            continue
+            return None
+    
+    # Testa as câmeras em paralelo: a abertura bloqueia no driver, não no GIL
+    with ThreadPoolExecutor(max_workers=max(1, max_cameras)) as executor:
+        results = list(executor.map(_probe, range(max_cameras)))
+    available_cameras = [r for r in results if r is not None]
     
     # Se não encontrar nenhuma câmera, adiciona índice 0 como padrão
     if not available_cameras:
@@ -161,13 +282,13 @@ def get_cached_camera(camera_index=0, force_new=False):
             import platform
             is_windows = platform.system() == 'Windows'
             
-            # Usa DirectShow no Windows para melhor compatibilidade
+            # No Windows usa o mesmo backend das demais aberturas
             if is_windows:
-                cap = cv2.VideoCapture(camera_index, cv2.CAP_DSHOW)
+                cap = open_windows_camera(camera_index)
             else:
                 cap = cv2.VideoCapture(camera_index)
             
-            if not cap.isOpened():
+            if cap is None or not cap.isOpened():
                 print(f"Erro: Não foi possível abrir a câmera {camera_index}")
                 return None
             
@@ -251,7 +372,27 @@ def release_all_cached_cameras():
         release_cached_camera(camera_index)
     print(f"Todas as câmeras do cache foram liberadas ({len(cameras_to_remove)} câmeras)")
 
-def capture_image_from_camera(camera_index=0, use_cache=True):
+# Anel de buffers de frame por câmera (reutilizados por capture_image_from_camera)
+_FRAME_POOL_SIZE = 2
+_frame_pool = {}
+
+
+def _read_into_frame_pool(cap, camera_index):
+    """
+    Lê um frame decodificando no próximo buffer do anel da câmera.
+    O OpenCV reaproveita o buffer quando forma/tipo coincidem; caso contrário
+    aloca um novo, que passa a ocupar o slot.
+    """
+    pool = _frame_pool.setdefault(camera_index, {'buffers': [None] * _FRAME_POOL_SIZE, 'next': 0})
+    slot = pool['next']
+    ret, frame = cap.read(pool['buffers'][slot])
+    if ret and frame is not None:
+        pool['buffers'][slot] = frame
+        pool['next'] = (slot + 1) % _FRAME_POOL_SIZE
+    return ret, frame
+
+
+def capture_image_from_camera(camera_index=0, use_cache=True, reuse_buffer=False):
     """
     Captura uma única imagem da webcam especificada.
     Retorna a imagem capturada ou None em caso de erro.
@@ -260,6 +401,9 @@ def capture_image_from_camera(camera_index=0, use_cache=True):
     Args:
         camera_index: Índice da câmera
         use_cache: Se True, usa cache de câmera para evitar reinicializações
+        reuse_buffer: Se True, decodifica num anel de buffers pré-alocados da câmera
+            (sem alocação a cada captura). O array retornado é sobrescrito após
+            _FRAME_POOL_SIZE novas capturas: use .copy() se precisar mantê-lo.
     """
     try:
         if use_cache:
@@ -272,11 +416,11 @@ def capture_image_from_camera(camera_index=0, use_cache=True):
             is_windows = platform.system() == 'Windows'
             
             if is_windows:
-                cap = cv2.VideoCapture(camera_index, cv2.CAP_DSHOW)
+                cap = open_windows_camera(camera_index)
             else:
                 cap = cv2.VideoCapture(camera_index)
             
-            if not cap.isOpened():
+            if cap is None or not cap.isOpened():
                 print(f"Erro: Não foi possível abrir a câmera {camera_index}")
                 return None
             
@@ -286,13 +430,16 @@ def capture_image_from_camera(camera_index=0, use_cache=True):
             cap.set(cv2.CAP_PROP_FPS, 30)
         
         # Limpa buffer antigo para obter frame mais recente
+        # grab() apenas avança o buffer, sem decodificar o frame descartado
         for _ in range(3):
-            ret, frame = cap.read()
-            if not ret:
+            if not cap.grab():
                 break
         
         # Captura a imagem final
-        ret, frame = cap.read()
+        if reuse_buffer:
+            ret, frame = _read_into_frame_pool(cap, camera_index)
+        else:
+            ret, frame = cap.read()
         
         # Libera apenas se não estiver usando cache
         if not use_cache:
@@ -322,12 +469,88 @@ def capture_image_from_camera(camera_index=0, use_cache=True):
         
         return None
 
-def cv2_to_tk(img_bgr, max_w=None, max_h=None, scale_percent=None):
+# Janelas HighGUI (cv2.imshow) ficam em uma thread própria; a thread do Tk apenas
+# enfileira comandos ('show', 'hide', 'close_all') e nunca bloqueia no OpenCV
+_display_queue = queue.Queue()
+_display_thread = None
+_display_lock = threading.Lock()
+
+
+def _display_loop():
+    """Laço da thread de exibição: executa os comandos e processa eventos das janelas."""
+    open_windows = set()
+    while True:
+        try:
+            # Com janelas abertas, acorda periodicamente para o waitKey
+            command, window_name, image = _display_queue.get(timeout=0.03 if open_windows else None)
+        except queue.Empty:
+            command = None
+        
+        try:
+            if command == 'show':
+                cv2.imshow(window_name, image)
+                open_windows.add(window_name)
+            elif command == 'hide' and window_name in open_windows:
+                cv2.destroyWindow(window_name)
+                open_windows.discard(window_name)
+            elif command == 'close_all' and open_windows:
+                cv2.destroyAllWindows()
+                open_windows.clear()
+            
+            if open_windows:
+                cv2.waitKey(1)
+        except cv2.error as e:
+            print(f"Erro na janela de exibição {window_name}: {e}")
+            open_windows.discard(window_name)
+
+
+def post_display_command(command, window_name=None, image=None):
+    """
+    Enfileira um comando para a thread de exibição do OpenCV, iniciando-a na
+    primeira exibição. Comandos de fechamento sem a thread ativa são ignorados.
+    """
+    global _display_thread
+    with _display_lock:
+        if _display_thread is None:
+            if command != 'show':
+                return
+            _display_thread = threading.Thread(target=_display_loop, name="cv2-display", daemon=True)
+            _display_thread.start()
+    _display_queue.put((command, window_name, image))
+
+
+# Buffers reutilizáveis para cv2_to_tk, indexados por (altura, largura, canais, dtype)
+_tk_resize_buf = {}
+_tk_rgb_buf = {}
+_TK_BUF_MAX_ENTRIES = 4  # Limita o número de tamanhos mantidos (ex.: redimensionamento da janela)
+
+
+def _get_pooled_buffer(pool, shape, dtype, max_entries=_TK_BUF_MAX_ENTRIES):
+    """Obtém (ou cria) um buffer pré-alocado para o formato pedido."""
+    key = (shape, np.dtype(dtype).str)
+    buf = pool.get(key)
+    if buf is None:
+        if len(pool) >= max_entries:
+            pool.clear()
+        buf = np.empty(shape, dtype=dtype)
+        pool[key] = buf
+    return buf
+
+
+# PhotoImages reutilizáveis para exibição contínua (ex.: visualização ao vivo), por chave
+_photo_pool = {}
+
+
+def cv2_to_tk(img_bgr, max_w=None, max_h=None, scale_percent=None, photo_key=None):
     """
     Converte imagem OpenCV BGR para formato Tkinter PhotoImage,
     redimensionando para usar 100% da área disponível do canvas.
     
     Otimizada para preencher completamente o espaço disponível.
+    
+    Se photo_key for informado, o PhotoImage dessa chave é reaproveitado
+    (pixels atualizados com paste) enquanto o tamanho não mudar. O objeto
+    retornado é então compartilhado entre chamadas com a mesma chave.
     """
     # Validação de entrada
     if img_bgr is None or img_bgr.size == 0:
@@ -360,7 +583,8 @@ def cv2_to_tk(img_bgr, max_w=None, max_h=None, scale_percent=None):
         try:
             # Usa INTER_AREA para redução e INTER_LINEAR para ampliação
             interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_LINEAR
-            img_bgr_resized = cv2.resize(img_bgr, (new_w, new_h), interpolation=interpolation)
+            resize_buf = _get_pooled_buffer(_tk_resize_buf, (new_h, new_w) + img_bgr.shape[2:], img_bgr.dtype)
+            img_bgr_resized = cv2.resize(img_bgr, (new_w, new_h), dst=resize_buf, interpolation=interpolation)
         except cv2.error as e:
              print(f"Erro ao redimensionar imagem: {e}. Dimensões: ({new_w}x{new_h})")
              return None, 1.0
@@ -369,8 +593,19 @@ def cv2_to_tk(img_bgr, max_w=None, max_h=None, scale_percent=None):
 
     # Conversão para Tkinter
     try:
-        img_rgb = cv2.cvtColor(img_bgr_resized, cv2.COLOR_BGR2RGB)
-        photo_image = ImageTk.PhotoImage(Image.fromarray(img_rgb))
+        rgb_buf = _get_pooled_buffer(_tk_rgb_buf, img_bgr_resized.shape[:2] + (3,), img_bgr_resized.dtype)
+        img_rgb = cv2.cvtColor(img_bgr_resized, cv2.COLOR_BGR2RGB, dst=rgb_buf)
+        # frombuffer embrulha o buffer RGB contíguo sem cópia intermediária
+        pil_image = Image.frombuffer('RGB', (img_rgb.shape[1], img_rgb.shape[0]), img_rgb, 'raw', 'RGB', 0, 1)
+        if photo_key is not None:
+            photo_image = _photo_pool.get(photo_key)
+            if photo_image is not None and (photo_image.width(), photo_image.height()) == pil_image.size:
+                photo_image.paste(pil_image)
+                return photo_image, scale
+            photo_image = ImageTk.PhotoImage(pil_image)
+            _photo_pool[photo_key] = photo_image
+            return photo_image, scale
+        photo_image = ImageTk.PhotoImage(pil_image)
         return photo_image, scale
     except Exception as e:
         print(f"Erro ao converter imagem para Tkinter: {e}")
@@ -397,21 +632,162 @@ except Exception as e:
     print(f"Erro ao inicializar ORB: {e}. O registro de imagem não funcionará.")
     orb = None
 
+# OpenCL (T-API) para o ORB quando houver dispositivo disponível
+try:
+    _USE_OCL = cv2.ocl.haveOpenCL()
+    cv2.ocl.setUseOpenCL(_USE_OCL)
+except Exception:
+    _USE_OCL = False
+
+
+def _orb_detect_and_compute(gray):
+    """
+    Executa orb.detectAndCompute via UMat (OpenCL) quando disponível.
+    Em caso de falha do backend OpenCL, desativa-o e usa a CPU.
+    """
+    global _USE_OCL
+    if _USE_OCL:
+        try:
+            keypoints, descriptors = orb.detectAndCompute(cv2.UMat(gray), None)
+            if isinstance(descriptors, cv2.UMat):
+                descriptors = descriptors.get()
+            return keypoints, descriptors
+        except cv2.error as e:
+            print(f"OpenCL indisponível para ORB, usando CPU: {e}")
+            _USE_OCL = False
+    return orb.detectAndCompute(gray, None)
+
+def _orb_features(gray):
+    """
+    Detecta ORB numa versão reduzida da imagem (lado maior <= ORB_MAX_DIM).
+    Retorna (keypoints, descritores, pontos Nx2 em coordenadas da imagem original),
+    de modo que a homografia é estimada diretamente na resolução original.
+    """
+    h, w = gray.shape[:2]
+    scale = min(1.0, ORB_MAX_DIM / max(h, w))
+    if scale < 1.0:
+        small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    else:
+        small = gray
+    keypoints, descriptors = _orb_detect_and_compute(small)
+    points = np.array([k.pt for k in keypoints], dtype=np.float32).reshape(-1, 2)
+    if small is not gray:
+        points *= np.array([w / small.shape[1], h / small.shape[0]], dtype=np.float32)
+    return keypoints, descriptors, points
+
+# Matcher FLANN com índice LSH (adequado para descritores binários do ORB)
+try:
+    flann_matcher = cv2.FlannBasedMatcher(
+        dict(algorithm=6,          # FLANN_INDEX_LSH
+             table_number=6,
+             key_size=12,
+             multi_probe_level=1),
+        {}
+    )
+except Exception as e:
+    print(f"Erro ao inicializar FLANN: {e}. Usando BFMatcher.")
+    flann_matcher = None
+
 # Cache para descritores de imagem de referência (otimização)
 _ref_image_cache = {
+    'ref_key': None,
+    'ref_image': None,
     'image_hash': None,
     'keypoints': None,
     'descriptors': None,
+    'points': None,
     'gray_image': None
 }
 
 
-def find_image_transform(img_ref, img_test):
+def _ref_fingerprint(gray):
+    """
+    Impressão digital barata da imagem de referência para o cache de descritores.
+    Usa forma, strides e uma subamostragem esparsa em vez de copiar a imagem inteira.
+    """
+    sample = np.ascontiguousarray(gray[::32, ::32])
+    if xxhash is not None:
+        return (gray.shape, gray.strides, xxhash.xxh3_64_intdigest(sample))
+    return (gray.shape, gray.strides, sample.tobytes())
+
+
+# Cache da última imagem de teste alinhada (evita re-detecção ORB em frames estáticos)
+_test_image_cache = {
+    'dhash': None,
+    'ref_hash': None,
+    'gray_image': None,
+    'src_points': None,
+    'dst_points': None,
+    'M': None,
+    'inliers': 0
+}
+
+
+def _dhash(gray):
+    """Calcula o dHash (hash de diferença) de uma imagem em escala de cinza."""
+    small = cv2.resize(gray, (DHASH_SIZE + 1, DHASH_SIZE), interpolation=cv2.INTER_AREA)
+    return np.packbits(small[:, 1:] > small[:, :-1])
+
+
+def _update_test_cache(test_hash, ref_hash, gray_test, src_pts, dst_pts, M, inliers):
+    """Guarda a última homografia válida e os pontos inliers para rastreamento."""
+    _test_image_cache.update({
+        'dhash': test_hash,
+        'ref_hash': ref_hash,
+        'gray_image': gray_test,
+        'src_points': src_pts,
+        'dst_points': dst_pts,
+        'M': M,
+        'inliers': inliers
+    })
+
+
+def _track_homography(gray_test, test_hash):
+    """
+    Recalcula a homografia rastreando (Lucas-Kanade) os pontos da última imagem
+    de teste em vez de executar o ORB novamente.
+    Retorna (M, inliers) ou None se o rastreamento não for confiável.
+    """
+    prev_gray = _test_image_cache['gray_image']
+    prev_pts = _test_image_cache['dst_points']
+    if prev_gray is None or prev_pts is None or prev_gray.shape != gray_test.shape:
+        return None
+    
+    next_pts, status, _ = cv2.calcOpticalFlowPyrLK(prev_gray, gray_test, prev_pts, None,
+                                                   winSize=(21, 21), maxLevel=3)
+    if next_pts is None:
+        return None
+    
+    tracked = status.ravel() == 1
+    if np.count_nonzero(tracked) < LK_MIN_TRACKED:
+        return None
+    
+    src_pts = _test_image_cache['src_points'][tracked]
+    dst_pts = next_pts[tracked]
+    M, mask = cv2.findHomography(src_pts, dst_pts, method=HOMOGRAPHY_METHOD,
+                                 ransacReprojThreshold=3.0, maxIters=HOMOGRAPHY_MAX_ITERS,
+                                 confidence=0.99)
+    if M is None:
+        return None
+    
+    inliers = mask.ravel() == 1
+    inliers_count = int(np.count_nonzero(inliers))
+    if inliers_count < LK_MIN_TRACKED:
+        return None
+    
+    _update_test_cache(test_hash, _test_image_cache['ref_hash'], gray_test,
+                       src_pts[inliers], dst_pts[inliers], M, inliers_count)
+    return M, inliers_count
+
+
+def find_image_transform(img_ref, img_test, gray_test=None):
     """
     Encontra a transformação entre duas imagens usando ORB.
+    gray_test (opcional) é img_test já convertida para cinza pelo chamador.
     
     Otimizada com:
     - Cache para imagem de referência
+    - Cache da última imagem de teste (dHash) com rastreamento LK
     - Validação de entrada mais eficiente
     - Matching otimizado
     
@@ -431,13 +807,26 @@ def find_image_transform(img_ref, img_test):
         return None, 0, error_msg
     
     try:
-        # Converte para escala de cinza
-        gray_ref = cv2.cvtColor(img_ref, cv2.COLOR_BGR2GRAY) if len(img_ref.shape) == 3 else img_ref
-        gray_test = cv2.cvtColor(img_test, cv2.COLOR_BGR2GRAY) if len(img_test.shape) == 3 else img_test
+        # Converte para escala de cinza (a referência reaproveita a conversão em cache
+        # enquanto for o mesmo objeto de imagem)
+        ref_key = (id(img_ref), img_ref.shape, img_ref.strides)
+        cached_ref = _ref_image_cache['ref_image']
+        if (_ref_image_cache['ref_key'] == ref_key and
+                cached_ref is not None and cached_ref() is img_ref):
+            gray_ref = _ref_image_cache['gray_image']
+        else:
+            gray_ref = cv2.cvtColor(img_ref, cv2.COLOR_BGR2GRAY) if len(img_ref.shape) == 3 else img_ref
+            _ref_image_cache.update({
+                'ref_key': ref_key,
+                'ref_image': weakref.ref(img_ref),
+                'gray_image': gray_ref  # Já é um array próprio (saída do cvtColor) ou a própria referência
+            })
+        if gray_test is None:
+            gray_test = cv2.cvtColor(img_test, cv2.COLOR_BGR2GRAY) if len(img_test.shape) == 3 else img_test
         
         # === CACHE PARA IMAGEM DE REFERÊNCIA ===
-        # Calcula hash simples da imagem de referência
-        ref_hash = hash(gray_ref.tobytes())
+        # Calcula impressão digital da imagem de referência (subamostrada)
+        ref_hash = _ref_fingerprint(gray_ref)
         
         # Verifica se pode usar cache
         if (_ref_image_cache['image_hash'] == ref_hash and 
@@ -446,21 +835,37 @@ def find_image_transform(img_ref, img_test):
             # Usa dados do cache
             kp_ref = _ref_image_cache['keypoints']
             desc_ref = _ref_image_cache['descriptors']
+            pts_ref = _ref_image_cache['points']
             print("Usando cache para imagem de referência")
         else:
             # Detecta keypoints e descritores para referência
-            kp_ref, desc_ref = orb.detectAndCompute(gray_ref, None)
+            kp_ref, desc_ref, pts_ref = _orb_features(gray_ref)
             # Atualiza cache
             _ref_image_cache.update({
                 'image_hash': ref_hash,
                 'keypoints': kp_ref,
                 'descriptors': desc_ref,
-                'gray_image': gray_ref.copy()
+                'points': pts_ref
             })
             print("Cache atualizado para imagem de referência")
         
+        # === CACHE PARA IMAGEM DE TESTE ===
+        # Frames idênticos reutilizam a homografia; frames parecidos rastreiam os pontos
+        test_hash = _dhash(gray_test)
+        if _test_image_cache['dhash'] is not None and _test_image_cache['ref_hash'] == ref_hash:
+            distance = int(np.unpackbits(test_hash ^ _test_image_cache['dhash']).sum())
+            if distance == 0:
+                print("Usando homografia em cache (imagem de teste inalterada)")
+                return _test_image_cache['M'], _test_image_cache['inliers'], None
+            if distance <= DHASH_MAX_DISTANCE:
+                tracked = _track_homography(gray_test, test_hash)
+                if tracked is not None:
+                    M, inliers_count = tracked
+                    print(f"Homografia rastreada (LK): {inliers_count} inliers")
+                    return M, inliers_count, None
+        
         # Detecta keypoints e descritores para teste (sempre novo)
-        kp_test, desc_test = orb.detectAndCompute(gray_test, None)
+        kp_test, desc_test, pts_test = _orb_features(gray_test)
         
         # Validação de descritores
         if desc_ref is None or desc_test is None:
@@ -474,33 +879,42 @@ def find_image_transform(img_ref, img_test):
             return None, 0, error_msg
         
         # === MATCHING OTIMIZADO ===
-        # Usa BFMatcher otimizado com crossCheck
-        matcher = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=True)
-        matches = matcher.match(desc_ref, desc_test)
+        # kNN (k=2) com índice LSH + teste de razão de Lowe
+        if flann_matcher is not None:
+            pairs = flann_matcher.knnMatch(desc_ref, desc_test, k=2)
+        else:
+            pairs = cv2.BFMatcher(cv2.NORM_HAMMING).knnMatch(desc_ref, desc_test, k=2)
         
-        if len(matches) < 4:
-            error_msg = f"Poucos matches encontrados: {len(matches)}"
-            print(error_msg)
-            return None, len(matches), error_msg
+        # O LSH pode devolver menos de 2 vizinhos para alguns descritores
+        good_matches = [p[0] for p in pairs
+                        if len(p) == 2 and p[0].distance < ORB_RATIO_TEST * p[1].distance]
         
-        # Ordena matches por distância e filtra os melhores
-        matches = sorted(matches, key=lambda x: x.distance)
+        if len(good_matches) < 4:
+            error_msg = f"Poucos matches encontrados: {len(good_matches)}"
+            print(error_msg)
+            return None, len(good_matches), error_msg
         
-        # Usa apenas os melhores matches para melhor performance
-        max_matches = min(len(matches), 100)  # Limita a 100 melhores matches
-        good_matches = matches[:max_matches]
+        # Limita aos melhores matches com seleção parcial O(N) (a ordem não importa
+        # para o estimador robusto, então não é necessário ordenar)
+        if len(good_matches) > ORB_MAX_MATCHES:
+            distances = np.fromiter((m.distance for m in good_matches), dtype=np.float32, count=len(good_matches))
+            best_idx = np.argpartition(distances, ORB_MAX_MATCHES)[:ORB_MAX_MATCHES]
+            good_matches = [good_matches[i] for i in best_idx]
         
-        # Extrai pontos correspondentes
-        src_pts = np.float32([kp_ref[m.queryIdx].pt for m in good_matches]).reshape(-1, 1, 2)
-        dst_pts = np.float32([kp_test[m.trainIdx].pt for m in good_matches]).reshape(-1, 1, 2)
+        # Extrai pontos correspondentes (indexação vetorizada)
+        n_good = len(good_matches)
+        query_idx = np.fromiter((m.queryIdx for m in good_matches), dtype=np.int32, count=n_good)
+        train_idx = np.fromiter((m.trainIdx for m in good_matches), dtype=np.int32, count=n_good)
+        src_pts = pts_ref[query_idx][:, None, :]
+        dst_pts = pts_test[train_idx][:, None, :]
         
         # === CÁLCULO DE HOMOGRAFIA OTIMIZADO ===
-        # Usa parâmetros otimizados para RANSAC
+        # Usa MAGSAC++ (converge com menos iterações que o RANSAC clássico)
         M, mask = cv2.findHomography(
             src_pts, dst_pts, 
-            method=cv2.RANSAC,
+            method=HOMOGRAPHY_METHOD,
             ransacReprojThreshold=3.0,  # Threshold mais restritivo
-            maxIters=2000,              # Máximo de iterações
+            maxIters=HOMOGRAPHY_MAX_ITERS,  # Máximo de iterações
             confidence=0.99             # Confiança desejada
         )
         
@@ -512,6 +926,10 @@ def find_image_transform(img_ref, img_test):
         inliers_count = np.sum(mask)
         inlier_ratio = inliers_count / len(good_matches)
         
+        inliers = mask.ravel() == 1
+        _update_test_cache(test_hash, ref_hash, gray_test,
+                           src_pts[inliers], dst_pts[inliers], M, inliers_count)
+        
         print(f"Homografia calculada: {inliers_count}/{len(good_matches)} inliers ({inlier_ratio:.2%})")
         return M, inliers_count, None
         
@@ -521,6 +939,32 @@ def find_image_transform(img_ref, img_test):
         return None, 0, error_msg
 
 
+@njit(cache=True)
+def _bbox_clip(corners, img_h, img_w):
+    """
+    Bounding box (x, y, w, h) de cantos Nx2, limitada às dimensões da imagem.
+    Laço escalar compilado: evita o overhead do NumPy em arrays de 4 elementos.
+    """
+    x_min = x_max = corners[0, 0]
+    y_min = y_max = corners[0, 1]
+    for i in range(1, corners.shape[0]):
+        cx = corners[i, 0]
+        cy = corners[i, 1]
+        if cx < x_min:
+            x_min = cx
+        elif cx > x_max:
+            x_max = cx
+        if cy < y_min:
+            y_min = cy
+        elif cy > y_max:
+            y_max = cy
+    x0 = max(0, int(x_min))
+    y0 = max(0, int(y_min))
+    x1 = min(img_w, int(x_max))
+    y1 = min(img_h, int(y_max))
+    return x0, y0, x1 - x0, y1 - y0
+
+
 def transform_rectangle(rect, M, img_shape):
     """
     Transforma um retângulo usando uma matriz de homografia.
@@ -546,22 +990,9 @@ def transform_rectangle(rect, M, img_shape):
         # Transforma os cantos
         transformed_corners = cv2.perspectiveTransform(corners, M)
         
-        # Calcula o bounding box dos cantos transformados
-        x_coords = transformed_corners[:, 0, 0]
-        y_coords = transformed_corners[:, 0, 1]
-        
-        x_min, x_max = np.min(x_coords), np.max(x_coords)
-        y_min, y_max = np.min(y_coords), np.max(y_coords)
-        
-        # Garante que está dentro dos limites da imagem
+        # Calcula o bounding box dos cantos transformados, limitado à imagem
         img_h, img_w = img_shape[:2]
-        x_min = max(0, int(x_min))
-        y_min = max(0, int(y_min))
-        x_max = min(img_w, int(x_max))
-        y_max = min(img_h, int(y_max))
-        
-        new_w = x_max - x_min
-        new_h = y_max - y_min
+        x_min, y_min, new_w, new_h = _bbox_clip(transformed_corners.reshape(4, 2), img_h, img_w)
         
         if new_w <= 0 or new_h <= 0:
             print(f"Retângulo transformado inválido: ({x_min}, {y_min}, {new_w}, {new_h})")
@@ -574,9 +1005,251 @@ def transform_rectangle(rect, M, img_shape):
         return None
 
 
-def check_slot(img_test, slot_data, M):
+# Buffers HSV reutilizáveis para a análise por histograma, indexados pela forma da ROI.
+# Um pool por thread, pois os slots são verificados em paralelo (_SLOT_POOL)
+_hsv_pool = threading.local()
+_HSV_POOL_MAX_ENTRIES = 64
+
+# Executor compartilhado para verificar os slots de uma inspeção em paralelo
+# (as chamadas do OpenCV liberam o GIL)
+_SLOT_POOL = ThreadPoolExecutor(max_workers=os.cpu_count() or 1)
+
+
+def _thread_hsv_pool():
+    """Retorna o pool de buffers HSV da thread atual."""
+    pool = getattr(_hsv_pool, 'buffers', None)
+    if pool is None:
+        pool = _hsv_pool.buffers = {}
+    return pool
+
+# Cache de classificadores ML carregados, indexado pelo caminho do modelo
+_ml_classifier_cache = {}
+
+
+def get_cached_ml_classifier(model_path):
+    """
+    Retorna o MLSlotClassifier do caminho informado, carregando do disco apenas
+    na primeira vez ou quando o arquivo do modelo for modificado (retreinamento).
+    Retorna None se o modelo não puder ser carregado.
+    """
+    model_path = str(model_path)
+    try:
+        mtime = os.path.getmtime(model_path)
+    except OSError:
+        _ml_classifier_cache.pop(model_path, None)
+        return None
+    
+    cached = _ml_classifier_cache.get(model_path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    
+    ml_classifier = MLSlotClassifier()
+    if not ml_classifier.load_model(model_path):
+        return None
+    _ml_classifier_cache[model_path] = (mtime, ml_classifier)
+    return ml_classifier
+
+
+def _template_mtime(template_path):
+    """
+    Verifica a existência do template e obtém seu mtime (chave dos caches de
+    template) com uma única chamada os.stat. Retorna None se não houver arquivo.
+    """
+    if not template_path:
+        return None
+    try:
+        st = os.stat(template_path)
+    except (OSError, ValueError):
+        return None
+    return st.st_mtime if stat.S_ISREG(st.st_mode) else None
+
+
+@lru_cache(maxsize=128)
+def _read_template_gray(template_path, mtime):
+    """
+    Decodifica o template e o converte para escala de cinza uma única vez por
+    versão do arquivo (o mtime faz parte da chave do cache).
+    Retorna o array uint8 somente leitura ou None.
+    """
+    template = cv2.imread(template_path)
+    if template is None:
+        return None
+    # Converte com cvtColor (e não IMREAD_GRAYSCALE) para manter os mesmos pesos
+    # de luminância usados na ROI; o custo só ocorre na primeira carga
+    template_gray = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
+    template_gray.setflags(write=False)
+    return template_gray
+
+
+@lru_cache(maxsize=128)
+def _load_template_gray(template_path, mtime, scale_tolerance):
+    """
+    Pré-calcula as versões escaladas do template em cinza (cada uma com sua
+    pirâmide gaussiana) usadas no template matching. O mtime faz parte da chave
+    do cache, então um template regravado no treinamento é recarregado
+    automaticamente.
+    Retorna: (template_gray, ((escala, (nível0, nível1, ...)), ...)) ou None.
+    Os arrays retornados são compartilhados e marcados como somente leitura.
+    """
+    template_gray = _read_template_gray(template_path, mtime)
+    if template_gray is None:
+        return None
+    
+    # Testa apenas 3 escalas, começando pela original (permite saída antecipada)
+    if scale_tolerance > 0:
+        scales = (1.0, 1.0 - scale_tolerance, 1.0 + scale_tolerance)
+    else:
+        scales = (1.0,)  # Apenas escala original
+    
+    scaled_templates = []
+    for scale in scales:
+        scaled_w = int(template_gray.shape[1] * scale)
+        scaled_h = int(template_gray.shape[0] * scale)
+        if scaled_w <= 0 or scaled_h <= 0:
+            continue
+        if scale == 1.0:
+            scaled = template_gray
+        else:
+            # Usa INTER_AREA para redução, INTER_LINEAR para ampliação
+            interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_LINEAR
+            scaled = cv2.resize(template_gray, (scaled_w, scaled_h), interpolation=interpolation)
+            scaled.setflags(write=False)
+        
+        # Pirâmide do template: reduz enquanto o topo continuar com >= PYR_MIN_TEMPLATE px
+        pyramid = [scaled]
+        while (len(pyramid) <= PYR_MAX_LEVELS and
+               min(pyramid[-1].shape) >= 2 * PYR_MIN_TEMPLATE):
+            level = cv2.pyrDown(pyramid[-1])
+            level.setflags(write=False)
+            pyramid.append(level)
+        scaled_templates.append((scale, tuple(pyramid)))
+    
+    return template_gray, tuple(scaled_templates)
+
+
+# Buffer de resultado do matchTemplate, um por thread; só cresce, e cada chamada usa
+# uma view do tamanho exato (o resultado é consumido antes da próxima chamada)
+_match_result_buf = threading.local()
+
+
+def _match_template(image, template, method):
+    """cv2.matchTemplate escrevendo em uma view do buffer reutilizável da thread."""
+    rows = image.shape[0] - template.shape[0] + 1
+    cols = image.shape[1] - template.shape[1] + 1
+    buf = getattr(_match_result_buf, 'buf', None)
+    if buf is None or buf.shape[0] < rows or buf.shape[1] < cols:
+        if buf is not None:
+            rows_alloc, cols_alloc = max(rows, buf.shape[0]), max(cols, buf.shape[1])
+        else:
+            rows_alloc, cols_alloc = rows, cols
+        buf = _match_result_buf.buf = np.empty((rows_alloc, cols_alloc), dtype=np.float32)
+    return cv2.matchTemplate(image, template, method, result=buf[:rows, :cols])
+
+
+# Função de casamento já especializada por método e se o melhor casamento é o
+# mínimo (TM_SQDIFF_NORMED), resolvidas uma vez por slot em vez de a cada chamada
+_TEMPLATE_DISPATCH = {
+    name: (partial(_match_template, method=method), method == cv2.TM_SQDIFF_NORMED)
+    for name, method in TEMPLATE_METHODS.items()
+}
+
+
+def _pyramid_coarse_match(roi_pyramid, template_pyramid, match_fn, use_min):
+    """
+    Busca completa do template apenas no topo da sua pirâmide.
+    roi_pyramid é uma lista [roi, pyrDown(roi), ...] estendida sob demanda, para
+    ser compartilhada entre as escalas do mesmo slot.
+    Retorna (score, nível, posição); com use_min (TM_SQDIFF_NORMED) o score já é
+    invertido, de modo que maior é sempre melhor.
+    """
+    top = len(template_pyramid) - 1
+    while len(roi_pyramid) <= top:
+        roi_pyramid.append(cv2.pyrDown(roi_pyramid[-1]))
+    
+    # Reduz níveis cuja ROI ficou menor que o template (arredondamentos do pyrDown)
+    while top > 0 and (template_pyramid[top].shape[0] > roi_pyramid[top].shape[0] or
+                       template_pyramid[top].shape[1] > roi_pyramid[top].shape[1]):
+        top -= 1
+    
+    result = match_fn(roi_pyramid[top], template_pyramid[top])
+    min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
+    if use_min:
+        return 1.0 - min_val, top, min_loc
+    return max_val, top, max_loc
+
+
+def _pyramid_refine(roi_pyramid, template_pyramid, match_fn, use_min, top, loc, score):
+    """
+    Refina a posição encontrada no nível `top` descendo a pirâmide, buscando em uma
+    vizinhança de PYR_REFINE_RADIUS px em cada nível mais fino.
+    Retorna o score no nível original (maior é melhor, como em _pyramid_coarse_match).
+    """
+    bx, by = loc
+    
+    for level in range(top - 1, -1, -1):
+        roi = roi_pyramid[level]
+        tmpl = template_pyramid[level]
+        max_x = roi.shape[1] - tmpl.shape[1]
+        max_y = roi.shape[0] - tmpl.shape[0]
+        
+        # Janela de posições candidatas ao redor do ponto projetado do nível anterior
+        x0 = min(max(2 * bx - PYR_REFINE_RADIUS, 0), max_x)
+        y0 = min(max(2 * by - PYR_REFINE_RADIUS, 0), max_y)
+        x1 = min(2 * bx + PYR_REFINE_RADIUS, max_x)
+        y1 = min(2 * by + PYR_REFINE_RADIUS, max_y)
+        
+        window = roi[y0:y1 + tmpl.shape[0], x0:x1 + tmpl.shape[1]]
+        result = match_fn(window, tmpl)
+        min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
+        score, (bx, by) = (1.0 - min_val, min_loc) if use_min else (max_val, max_loc)
+        bx += x0
+        by += y0
+    
+    return score
+
+
+_SSIM_WINDOW = (SSIM_WIN_SIZE, SSIM_WIN_SIZE)
+
+
+def _ssim_cv2(img1, img2):
+    """
+    SSIM médio entre duas imagens uint8 em escala de cinza, calculado com filtros
+    do OpenCV. Reproduz o structural_similarity padrão do skimage (janela uniforme
+    7x7, borda refletida, covariância amostral e descarte da borda de 3 px), de modo
+    que os limiares já calibrados nos slots continuam válidos.
+    As médias por janela usam boxFilter/sqrBoxFilter (somas corridas, custo
+    constante por pixel), lendo direto o uint8 e escrevendo em float32.
+    """
+    def _box(x):
+        return cv2.boxFilter(x, cv2.CV_32F, _SSIM_WINDOW, borderType=cv2.BORDER_REFLECT)
+    
+    def _sqr_box(x):
+        return cv2.sqrBoxFilter(x, cv2.CV_32F, _SSIM_WINDOW, borderType=cv2.BORDER_REFLECT)
+    
+    mu1 = _box(img1)
+    mu2 = _box(img2)
+    mu1_sq = mu1 * mu1
+    mu2_sq = mu2 * mu2
+    mu1_mu2 = mu1 * mu2
+    
+    # Covariância amostral (N / (N - 1)), como no skimage
+    cov_norm = SSIM_WIN_SIZE ** 2 / (SSIM_WIN_SIZE ** 2 - 1.0)
+    sigma1_sq = cov_norm * (_sqr_box(img1) - mu1_sq)
+    sigma2_sq = cov_norm * (_sqr_box(img2) - mu2_sq)
+    sigma12 = cov_norm * (_box(cv2.multiply(img1, img2, dtype=cv2.CV_32F)) - mu1_mu2)
+    
+    ssim_map = ((2 * mu1_mu2 + SSIM_C1) * (2 * sigma12 + SSIM_C2) /
+                ((mu1_sq + mu2_sq + SSIM_C1) * (sigma1_sq + sigma2_sq + SSIM_C2)))
+    
+    pad = (SSIM_WIN_SIZE - 1) // 2
+    return cv2.mean(ssim_map[pad:-pad, pad:-pad])[0]
+
+
+def check_slot(img_test, slot_data, M, img_gray=None):
     """
     Verifica um slot na imagem de teste.
+    img_gray (opcional) é a imagem de teste já convertida para cinza pelo chamador;
+    quando informada, as ROIs em cinza são apenas fatias dela.
     Retorna: (passou, correlation, pixels, corners, bbox, log_msgs)
     """
     log_msgs = []
@@ -584,7 +1257,11 @@ def check_slot(img_test, slot_data, M):
     bbox = [0, 0, 0, 0]
     
     try:
-        slot_type = slot_data.get('tipo', 'clip')
+        # Campos usados em vários ramos, lidos uma única vez
+        get = slot_data.get
+        slot_type = get('tipo', 'clip')
+        ok_threshold = get('ok_threshold', 70) / 100.0  # Converte % para decimal
+        template_path = get('template_path')
         x, y, w, h = slot_data['x'], slot_data['y'], slot_data['w'], slot_data['h']
         
         # Calcula os cantos originais do slot
@@ -622,15 +1299,18 @@ def check_slot(img_test, slot_data, M):
             log_msgs.append("ROI vazia")
             return False, 0.0, 0, corners, bbox, log_msgs
         
+        # ROI em cinza: fatia do frame convertido pelo chamador ou, sem ele, convertida
+        # apenas nos métodos que a utilizam
+        roi_gray = img_gray[y:y+h, x:x+w] if img_gray is not None else None
+        
         if slot_type == 'clip':
             # Verifica se deve usar Machine Learning
-            if slot_data.get('use_ml', False) and slot_data.get('ml_model_path'):
+            if get('use_ml', False) and get('ml_model_path'):
                 try:
-                    from .ml_classifier import MLSlotClassifier
-                    
-                    # Carrega o modelo ML
-                    ml_classifier = MLSlotClassifier()
-                    ml_classifier.load_model(slot_data['ml_model_path'])
+                    # Obtém o modelo ML do cache (carrega do disco apenas uma vez)
+                    ml_classifier = get_cached_ml_classifier(slot_data['ml_model_path'])
+                    if ml_classifier is None:
+                        raise RuntimeError(f"Modelo ML não pôde ser carregado: {slot_data['ml_model_path']}")
                     
                     # Faz a predição usando ML
                     prediction, confidence = ml_classifier.predict(roi)
@@ -646,13 +1326,14 @@ def check_slot(img_test, slot_data, M):
                     # Continua com método tradicional em caso de erro
             
             # Verifica método de detecção
-            detection_method = slot_data.get('detection_method', 'template_matching')
+            detection_method = get('detection_method', 'template_matching')
             
             if detection_method == 'histogram_analysis':
                 # === ANÁLISE POR HISTOGRAMA ===
                 try:
                     # Calcula histograma da ROI em HSV
-                    roi_hsv = cv2.cvtColor(roi, cv2.COLOR_BGR2HSV)
+                    hsv_buf = _get_pooled_buffer(_thread_hsv_pool(), roi.shape, roi.dtype, _HSV_POOL_MAX_ENTRIES)
+                    roi_hsv = cv2.cvtColor(roi, cv2.COLOR_BGR2HSV, dst=hsv_buf)
                     
                     # Parâmetros do histograma
                     h_bins = 50
@@ -662,19 +1343,18 @@ def check_slot(img_test, slot_data, M):
                     # Calcula histograma 2D (H-S)
                     hist = cv2.calcHist([roi_hsv], [0, 1], None, [h_bins, s_bins], hist_range)
                     
-                    # Normaliza histograma
-                    cv2.normalize(hist, hist, 0, 1, cv2.NORM_MINMAX)
+                    # Normaliza histograma para [0, 1] in-place (equivalente a NORM_MINMAX)
+                    hist_min, hist_range_max, _, _ = cv2.minMaxLoc(hist)
+                    if hist_range_max > hist_min:
+                        hist -= hist_min
+                        hist *= 1.0 / (hist_range_max - hist_min)
                     
                     # Calcula métricas do histograma
-                    np.sum(hist)
-                    np.mean(hist)
                     hist_std = np.std(hist)
                     hist_max = np.max(hist)
                     
-                    # Calcula entropia do histograma
-                    hist_flat = hist.flatten()
-                    hist_flat = hist_flat[hist_flat > 0]  # Remove zeros
-                    entropy = -np.sum(hist_flat * np.log2(hist_flat + 1e-10))
+                    # Calcula entropia do histograma (entr = -x*ln(x), trata zeros nativamente)
+                    entropy = float(entr(hist.ravel()).sum()) * LOG2_E
                     
                     # Score baseado em múltiplas métricas
                     # Combina entropia (diversidade de cores) e distribuição
@@ -683,19 +1363,17 @@ def check_slot(img_test, slot_data, M):
                     intensity_score = min(hist_max * 2, 1.0)  # Considera picos de intensidade
                     
                     # Score final combinado
-                    histogram_score = (entropy_score * 0.5 + distribution_score * 0.3 + intensity_score * 0.2)
+                    histogram_score = (entropy_score * HISTOGRAM_WEIGHTS[0] + distribution_score * HISTOGRAM_WEIGHTS[1] +
+                                       intensity_score * HISTOGRAM_WEIGHTS[2])
                     
                     # Usa limiar personalizado do slot ou padrão
                     if 'correlation_threshold' in slot_data:
-                        threshold = slot_data.get('correlation_threshold', 0.3)
+                        threshold = get('correlation_threshold', 0.3)
                         threshold_source = "correlation_threshold"
                     else:
-                        threshold = slot_data.get('detection_threshold', 30.0) / 100.0  # Converte % para decimal
+                        threshold = get('detection_threshold', 30.0) / 100.0  # Converte % para decimal
                         threshold_source = "detection_threshold"
                     
-                    # Usa a porcentagem para OK personalizada ou padrão
-                    ok_threshold = slot_data.get('ok_threshold', 70) / 100.0  # Converte % para decimal
-                    
                     # Verifica se passou baseado na porcentagem para OK
                     passou = histogram_score >= ok_threshold
                     
@@ -710,7 +1388,8 @@ def check_slot(img_test, slot_data, M):
                 # === ANÁLISE POR CONTORNO ===
                 try:
                     # Converte para escala de cinza
-                    roi_gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
+                    if roi_gray is None:
+                        roi_gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
                     
                     # Aplica blur para reduzir ruído
                     roi_blur = cv2.GaussianBlur(roi_gray, (5, 5), 0)
@@ -729,14 +1408,14 @@ def check_slot(img_test, slot_data, M):
                     # Calcula área total da ROI
                     roi_area = roi.shape[0] * roi.shape[1]
                     
-                    # Calcula área total dos contornos
-                    contour_area = sum(cv2.contourArea(cnt) for cnt in contours)
-                    
                     # Calcula número de contornos
                     num_contours = len(contours)
                     
-                    # Calcula perímetro total
-                    total_perimeter = sum(cv2.arcLength(cnt, True) for cnt in contours)
+                    # Calcula área e perímetro total dos contornos (arrays de tamanho conhecido)
+                    areas = np.fromiter((cv2.contourArea(cnt) for cnt in contours), dtype=np.float64, count=num_contours)
+                    perimeters = np.fromiter((cv2.arcLength(cnt, True) for cnt in contours), dtype=np.float64, count=num_contours)
+                    contour_area = float(areas.sum())
+                    total_perimeter = float(perimeters.sum())
                     
                     # Calcula complexidade média dos contornos (razão perímetro/área)
                     complexity = total_perimeter / (contour_area + 1e-10)
@@ -747,13 +1426,11 @@ def check_slot(img_test, slot_data, M):
                     complexity_score = min(1.0, 1.0 / (complexity + 0.1))  # Inverte para que menor complexidade = maior score
                     
                     # Score final combinado
-                    contour_score = (area_ratio * 0.4 + contour_count_score * 0.3 + complexity_score * 0.3)
+                    contour_score = (area_ratio * CONTOUR_WEIGHTS[0] + contour_count_score * CONTOUR_WEIGHTS[1] +
+                                     complexity_score * CONTOUR_WEIGHTS[2])
                     
                     # Usa limiar personalizado do slot ou padrão
-                    threshold = slot_data.get('detection_threshold', 0.5)
-                    
-                    # Usa a porcentagem para OK personalizada ou padrão
-                    ok_threshold = slot_data.get('ok_threshold', 70) / 100.0  # Converte % para decimal
+                    threshold = get('detection_threshold', 0.5)
                     
                     # Verifica se passou baseado na porcentagem para OK
                     passou = contour_score >= ok_threshold
@@ -768,53 +1445,51 @@ def check_slot(img_test, slot_data, M):
             elif detection_method == 'image_comparison':
                 # === COMPARAÇÃO DIRETA DE IMAGEM ===
                 try:
-                    template_path = slot_data.get('template_path')
-                    if not template_path or not Path(template_path).exists():
+                    template_mtime = _template_mtime(template_path)
+                    if template_mtime is None:
                         log_msgs.append("Template não encontrado para comparação de imagem")
                         return False, 0.0, 0, corners, bbox, log_msgs
                     
-                    # Carrega o template
-                    template = cv2.imread(str(template_path))
+                    # Carrega o template já em cinza (em cache enquanto o arquivo não mudar)
+                    template = _read_template_gray(str(template_path), template_mtime)
                     if template is None:
                         log_msgs.append("Erro ao carregar template para comparação de imagem")
                         return False, 0.0, 0, corners, bbox, log_msgs
                     
-                    # Redimensiona o template para o tamanho da ROI
-                    template_resized = cv2.resize(template, (roi.shape[1], roi.shape[0]))
+                    # Redimensiona o template para o tamanho da ROI (um só canal)
+                    template_gray = cv2.resize(template, (roi.shape[1], roi.shape[0]))
                     
-                    # Converte para escala de cinza
-                    roi_gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
-                    template_gray = cv2.cvtColor(template_resized, cv2.COLOR_BGR2GRAY)
-                    
-                    # Calcula SSIM (Structural Similarity Index)
-                    from skimage.metrics import structural_similarity as ssim
-                    try:
-                        ssim_score, _ = ssim(roi_gray, template_gray, full=True)
-                    except ImportError:
-                        # Fallback se skimage não estiver disponível
-                        # Calcula MSE (Mean Squared Error) e converte para similaridade
-                        mse = np.mean((roi_gray.astype("float") - template_gray.astype("float")) ** 2)
-                        ssim_score = 1 - (mse / 255**2)  # Normaliza para [0,1] onde 1 é perfeito
+                    # Converte a ROI para escala de cinza
+                    if roi_gray is None:
+                        roi_gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
                     
-                    # Calcula diferença absoluta
+                    # Calcula diferença absoluta (uint8, sem promoção para float)
                     diff = cv2.absdiff(roi_gray, template_gray)
-                    diff_score = 1.0 - (np.mean(diff) / 255.0)  # Normaliza para [0,1] onde 1 é perfeito
+                    diff_mean, diff_std = cv2.meanStdDev(diff)
+                    diff_mean = diff_mean[0, 0]
+                    diff_score = 1.0 - (diff_mean / 255.0)  # Normaliza para [0,1] onde 1 é perfeito
                     
-                    # Calcula histogramas e compara
+                    # Calcula SSIM (Structural Similarity Index)
+                    if min(roi_gray.shape) >= SSIM_WIN_SIZE:
+                        ssim_score = _ssim_cv2(roi_gray, template_gray)
+                    else:
+                        # Fallback para ROIs menores que a janela do SSIM
+                        # MSE (Mean Squared Error) = média² + desvio² da diferença absoluta
+                        mse = diff_mean ** 2 + diff_std[0, 0] ** 2
+                        ssim_score = 1 - (mse / MAX_SQUARED_DIFF)  # Normaliza para [0,1] onde 1 é perfeito
+                    
+                    # Calcula histogramas e compara (a correlação é invariante a escala e
+                    # deslocamento, então normalizar os histogramas antes não altera o score)
                     hist_roi = cv2.calcHist([roi_gray], [0], None, [256], [0, 256])
                     hist_template = cv2.calcHist([template_gray], [0], None, [256], [0, 256])
-                    cv2.normalize(hist_roi, hist_roi, 0, 1, cv2.NORM_MINMAX)
-                    cv2.normalize(hist_template, hist_template, 0, 1, cv2.NORM_MINMAX)
                     hist_score = cv2.compareHist(hist_roi, hist_template, cv2.HISTCMP_CORREL)
                     
                     # Score final combinado
-                    comparison_score = (ssim_score * 0.5 + diff_score * 0.3 + hist_score * 0.2)
+                    comparison_score = (ssim_score * COMPARISON_WEIGHTS[0] + diff_score * COMPARISON_WEIGHTS[1] +
+                                        hist_score * COMPARISON_WEIGHTS[2])
                     
                     # Usa limiar personalizado do slot ou padrão
-                    threshold = slot_data.get('detection_threshold', 0.7)
-                    
-                    # Usa a porcentagem para OK personalizada ou padrão
-                    ok_threshold = slot_data.get('ok_threshold', 70) / 100.0  # Converte % para decimal
+                    threshold = get('detection_threshold', 0.7)
                     
                     # Verifica se passou baseado na porcentagem para OK
                     passou = comparison_score >= ok_threshold
@@ -828,84 +1503,78 @@ def check_slot(img_test, slot_data, M):
             
             else:  # template_matching (método padrão)
                 # === TEMPLATE MATCHING PARA CLIPS ===
-                template_path = slot_data.get('template_path')
-                if not template_path or not Path(template_path).exists():
+                template_mtime = _template_mtime(template_path)
+                if template_mtime is None:
                     log_msgs.append("Template não encontrado")
                     return False, 0.0, 0, corners, bbox, log_msgs
                 
-                template = cv2.imread(str(template_path))
-                if template is None:
+                # === TEMPLATE MATCHING OTIMIZADO ===
+                template_method_str = get('template_method', 'TM_CCOEFF_NORMED')
+                scale_tolerance = get('scale_tolerance', 10.0) / 100.0
+                
+                # Template em cinza e versões escaladas vêm do cache (decodificados uma única vez)
+                cached_template = _load_template_gray(str(template_path), template_mtime, scale_tolerance)
+                if cached_template is None:
                     log_msgs.append("Erro ao carregar template")
                     return False, 0.0, 0, corners, bbox, log_msgs
-                
-                # === TEMPLATE MATCHING OTIMIZADO ===
-                slot_data.get('correlation_threshold', 0.7)
-                template_method_str = slot_data.get('template_method', 'TM_CCOEFF_NORMED')
-                scale_tolerance = slot_data.get('scale_tolerance', 10.0) / 100.0
-                
-                # Mapeamento otimizado de métodos
-                method_map = {
-                    'TM_CCOEFF_NORMED': cv2.TM_CCOEFF_NORMED,
-                    'TM_CCORR_NORMED': cv2.TM_CCORR_NORMED,
-                    'TM_SQDIFF_NORMED': cv2.TM_SQDIFF_NORMED
-                }
-                template_method = method_map.get(template_method_str, cv2.TM_CCOEFF_NORMED)
+                template_gray, scaled_templates = cached_template
+                match_fn, use_min = _TEMPLATE_DISPATCH.get(template_method_str,
+                                                           _TEMPLATE_DISPATCH['TM_CCOEFF_NORMED'])
                 
                 max_val = 0.0
                 best_scale = 1.0
                 
-                # Otimização: reduz número de escalas testadas
-                if scale_tolerance > 0:
-                    # Testa apenas 3 escalas para melhor performance
-                    scales = [1.0 - scale_tolerance, 1.0, 1.0 + scale_tolerance]
-                else:
-                    scales = [1.0]  # Apenas escala original
-                
-                # Pré-converte template para escala de cinza se necessário (otimização)
-                template_gray = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY) if len(template.shape) == 3 else template
-                roi_gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY) if len(roi.shape) == 3 else roi
-            
-            for scale in scales:
-                # Calcula dimensões da escala
-                scaled_w = int(template_gray.shape[1] * scale)
-                scaled_h = int(template_gray.shape[0] * scale)
-                
+                if roi_gray is None:
+                    roi_gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
+                # Pirâmide da ROI, construída sob demanda e compartilhada entre as escalas
+                roi_pyramid = [roi_gray]
+                best_coarse = None
+            
+            # Seleção de escala no topo da pirâmide (barato): cada escala faz uma única
+            # busca completa em resolução reduzida. A escala original (sempre a primeira)
+            # é refinada na hora, e só o seu score em resolução total decide a saída antecipada
+            for scale, template_pyramid in scaled_templates:
                 # Validação de dimensões otimizada
-                if (scaled_w <= 0 or scaled_h <= 0 or 
-                    scaled_w > roi_gray.shape[1] or scaled_h > roi_gray.shape[0]):
+                if (template_pyramid[0].shape[1] > roi_gray.shape[1] or
+                    template_pyramid[0].shape[0] > roi_gray.shape[0]):
                     continue
                 
-                # Redimensiona template (usa INTER_AREA para redução, INTER_LINEAR para ampliação)
-                interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_LINEAR
-                scaled_template = cv2.resize(template_gray, (scaled_w, scaled_h), interpolation=interpolation)
+                current_val, top, loc = _pyramid_coarse_match(roi_pyramid, template_pyramid, match_fn, use_min)
                 
-                # Template matching otimizado (usa imagens em escala de cinza)
-                result = cv2.matchTemplate(roi_gray, scaled_template, template_method)
-                
-                # Extrai valor de correlação
-                if template_method == cv2.TM_SQDIFF_NORMED:
-                    min_val, _, _, _ = cv2.minMaxLoc(result)
-                    current_val = 1.0 - min_val  # Inverte para SQDIFF
-                else:
-                    _, current_val, _, _ = cv2.minMaxLoc(result)
+                if scale == 1.0:
+                    refined_val = _pyramid_refine(roi_pyramid, template_pyramid, match_fn, use_min,
+                                                  top, loc, current_val)
+                    # Mantém o piso de 0.0 (correlações negativas contam como nenhuma)
+                    max_val = max(max_val, refined_val)
+                    
+                    # Encaixe claramente aprovado na escala original: não precisa
+                    # testar as demais escalas
+                    if refined_val >= ok_threshold + SCALE_EARLY_EXIT_MARGIN:
+                        break
+                    continue
                 
-                # Atualiza melhor resultado
-                if current_val > max_val:
-                    max_val = current_val
+                # Atualiza melhor resultado entre as demais escalas
+                if best_coarse is None or current_val > best_coarse[0]:
+                    best_coarse = (current_val, top, loc, template_pyramid, scale)
+            
+            # Das demais escalas, apenas a melhor é refinada até a resolução original
+            if best_coarse is not None:
+                coarse_val, top, loc, template_pyramid, scale = best_coarse
+                refined_val = _pyramid_refine(roi_pyramid, template_pyramid, match_fn, use_min,
+                                              top, loc, coarse_val)
+                if refined_val > max_val:
+                    max_val = refined_val
                     best_scale = scale
             
             # Usa limiar personalizado do slot ou padrão
             # Prioridade: correlation_threshold > detection_threshold > padrão global
             if 'correlation_threshold' in slot_data:
-                threshold = slot_data.get('correlation_threshold', 0.1)
+                threshold = get('correlation_threshold', 0.1)
                 threshold_source = "correlation_threshold"
             else:
-                threshold = slot_data.get('detection_threshold', 70.0) / 100.0  # Converte % para decimal
+                threshold = get('detection_threshold', 70.0) / 100.0  # Converte % para decimal
                 threshold_source = "detection_threshold"
             
-            # Usa a porcentagem para OK personalizada ou padrão
-            ok_threshold = slot_data.get('ok_threshold', 70) / 100.0  # Converte % para decimal
-            
             # Verifica se passou baseado na porcentagem para OK
             passou = max_val >= ok_threshold
             
@@ -951,10 +1620,11 @@ class EditSlotDialog(Toplevel):
             self.result = None
             self._is_destroyed = False
             
+            # Carrega a configuração de estilo uma única vez para todas as cores do diálogo
+            current_style_config = load_style_config()
+            
             # Inicializa configurações de estilo se não existirem
             if 'style_config' not in self.slot_data:
-                # Carrega configuração de estilo para obter cores centralizadas
-                current_style_config = load_style_config()
                 self.slot_data['style_config'] = {
                     'bg_color': get_color('colors.canvas_colors.canvas_bg', current_style_config),  # Cor de fundo padrão
                     'text_color': get_color('colors.text_color', current_style_config),  # Cor do texto padrão
@@ -969,7 +1639,7 @@ class EditSlotDialog(Toplevel):
             self.title(f"Editando Slot {slot_data['id']}")
             self.geometry("400x650")
             self.resizable(False, False)
-            self.configure(bg=get_color('colors.dialog_colors.window_bg'))  # Cor de fundo escura para toda a janela
+            self.configure(bg=get_color('colors.dialog_colors.window_bg', current_style_config))  # Cor de fundo escura para toda a janela
             
             # Configuração modal otimizada
             self.transient(parent)
@@ -979,24 +1649,16 @@ class EditSlotDialog(Toplevel):
             if not parent.winfo_exists():
                 raise RuntimeError("Janela pai não existe mais")
             
+            logger.debug("EditSlotDialog aberto para o slot %s", slot_data['id'])
+            
             try:
                 # === CONFIGURAÇÃO DA INTERFACE ===
-                print("Iniciando setup_ui...")
                 self.setup_ui()
-                print("setup_ui concluído")
-                
-                print("Iniciando load_slot_data...")
                 self.load_slot_data()
-                print("load_slot_data concluído")
-                
-                print("Iniciando center_window...")
                 self.center_window()
-                print("center_window concluído")
                 
                 # Aplica modalidade diretamente
-                print("Aplicando modalidade...")
                 self.apply_modal_grab()
-                print("Modalidade aplicada")
                 
             except Exception as ui_error:
                 print(f"Erro ao configurar interface: {ui_error}")
@@ -1031,13 +1693,11 @@ class EditSlotDialog(Toplevel):
             # Temporariamente removendo grab_set() para evitar travamentos
             # self.grab_set()
             self.focus_set()
-            print("Modal grab aplicado com sucesso (sem grab_set)")
         except Exception as e:
             print(f"Erro ao aplicar modal grab: {e}")
     
     def center_window(self):
         try:
-            print("Iniciando centralização da janela...")
             self.update_idletasks()
             
             # Centralização direta sem delay
@@ -1048,20 +1708,16 @@ class EditSlotDialog(Toplevel):
             y = (self.winfo_screenheight() // 2) - (height // 2)
             
             self.geometry(f"{width}x{height}+{x}+{y}")
-            print(f"Janela centralizada: {width}x{height}+{x}+{y}")
         except Exception as e:
             print(f"Erro ao centralizar janela: {e}")
     
     def setup_ui(self):
         """Configura interface otimizada do diálogo de edição"""
         try:
-            print("Criando frame principal...")
             # === FRAME PRINCIPAL ===
             main_frame = ttk.Frame(self)
             main_frame.pack(fill=BOTH, expand=True, padx=10, pady=10)
-            print("Frame principal criado")
             
-            print("Criando seção de informações...")
             # === INFORMAÇÕES DO SLOT ===
             info_frame = ttk.LabelFrame(main_frame, text="Informações do Slot")
             info_frame.pack(fill=X, pady=(0, 10))
@@ -1069,21 +1725,17 @@ class EditSlotDialog(Toplevel):
             # Labels de informação otimizadas
             slot_info = f"ID: {self.slot_data['id']} | Tipo: {self.slot_data['tipo']}"
             ttk.Label(info_frame, text=slot_info).pack(anchor="w", padx=5, pady=5)
-            print("Seção de informações criada")
             
-            print("Criando seção de edição de malha...")
             # === EDIÇÃO DE MALHA ===
             mesh_frame = ttk.LabelFrame(main_frame, text="Posição e Dimensões")
             mesh_frame.pack(fill=X, pady=(0, 10))
             
             # Inicialização otimizada de variáveis
-            print("Inicializando variáveis...")
             self.x_var = StringVar()
             self.y_var = StringVar()
             self.w_var = StringVar()
             self.h_var = StringVar()
             self.detection_threshold_var = StringVar()
-            print("Variáveis inicializadas")
             
             # Criação de um frame com grid de 2 colunas para melhor organização
             mesh_grid = ttk.Frame(mesh_frame)
@@ -1091,7 +1743,6 @@ class EditSlotDialog(Toplevel):
             mesh_grid.columnconfigure(0, weight=1)
             mesh_grid.columnconfigure(1, weight=1)
             
-            print("Criando campos de entrada...")
             # Primeira linha: X e Y lado a lado
             ttk.Label(mesh_grid, text="Posição X:").grid(row=0, column=0, sticky="w", padx=5, pady=5)
             ttk.Entry(mesh_grid, textvariable=self.x_var, width=8).grid(row=0, column=0, sticky="e", padx=5, pady=5)
@@ -1105,9 +1756,7 @@ class EditSlotDialog(Toplevel):
             
             ttk.Label(mesh_grid, text="Altura:").grid(row=1, column=1, sticky="w", padx=5, pady=5)
             ttk.Entry(mesh_grid, textvariable=self.h_var, width=8).grid(row=1, column=1, sticky="e", padx=5, pady=5)
-            print("Campos de entrada criados")
             
-            print("Criando seção de configurações...")
             # === CONFIGURAÇÕES BÁSICAS ===
             config_frame = ttk.LabelFrame(main_frame, text="Configurações")
             config_frame.pack(fill=X, pady=(0, 10))
@@ -1118,9 +1767,7 @@ class EditSlotDialog(Toplevel):
             
             ttk.Label(threshold_frame, text="Limiar de Detecção (%):").pack(side=LEFT)
             ttk.Entry(threshold_frame, textvariable=self.detection_threshold_var, width=10).pack(side=LEFT, padx=(5, 0))
-            print("Seção de configurações criada")
             
-            print("Criando botões de ação...")
             # === BOTÕES DE AÇÃO ===
             button_frame = ttk.Frame(main_frame)
             button_frame.pack(fill=X, pady=(10, 0))
@@ -1128,9 +1775,6 @@ class EditSlotDialog(Toplevel):
             # Botões otimizados
             ttk.Button(button_frame, text="Salvar", command=self.save_changes).pack(side=LEFT, padx=(0, 5))
             ttk.Button(button_frame, text="Cancelar", command=self.cancel).pack(side=LEFT)
-            print("Botões de ação criados")
-        
-            print("setup_ui concluído com sucesso")
             
         except Exception as e:
             print(f"Erro na configuração da UI: {e}")
@@ -1141,7 +1785,6 @@ class EditSlotDialog(Toplevel):
     
     def load_slot_data(self):
         try:
-            print(f"Carregando dados do slot: {self.slot_data}")
             # Carrega os dados do slot nos campos da interface
             if self.slot_data:
                 self.x_var.set(str(self.slot_data.get('x', 0)))
@@ -1149,9 +1792,6 @@ class EditSlotDialog(Toplevel):
                 self.w_var.set(str(self.slot_data.get('w', 100)))
                 self.h_var.set(str(self.slot_data.get('h', 100)))
                 self.detection_threshold_var.set(str(self.slot_data.get('detection_threshold', 50)))
-                print("Dados carregados com sucesso nos campos")
-            else:
-                print("Nenhum dado de slot para carregar")
         except Exception as e:
             print(f"Erro ao carregar dados do slot: {e}")
             messagebox.showerror("Erro", f"Erro ao carregar dados do slot: {str(e)}")
@@ -1178,10 +1818,10 @@ class EditSlotDialog(Toplevel):
             # Mostra template
             template = cv2.imread(str(template_path))
             if template is not None:
-                cv2.imshow(f"Template - Slot {self.slot_data['id']}", template)
+                post_display_command('show', f"Template - Slot {self.slot_data['id']}", template)
         else:
             # Oculta template
-            cv2.destroyWindow(f"Template - Slot {self.slot_data['id']}")
+            post_display_command('hide', f"Template - Slot {self.slot_data['id']}")
     
     def pick_new_color(self):
         """Função simplificada para escolher nova cor."""
@@ -1194,8 +1834,6 @@ class EditSlotDialog(Toplevel):
     def save_changes(self):
         """Salva as alterações feitas no slot."""
         try:
-            print(f"\n=== SALVANDO ALTERAÇÕES DO SLOT {self.slot_data.get('id', 'N/A')} ===")
-            
             # Validação e conversão dos valores
             try:
                 x_val = int(self.x_var.get().strip())
@@ -1223,12 +1861,8 @@ class EditSlotDialog(Toplevel):
             # Salva limiar de detecção
             self.slot_data['detection_threshold'] = threshold_val
             
-            print(f"Dados salvos: posição ({self.slot_data['x']},{self.slot_data['y']}), tamanho ({self.slot_data['w']},{self.slot_data['h']}), limiar {self.slot_data['detection_threshold']}%")
-            
             # Chama o método update_slot_data da instância malha_frame
-            print("Chamando update_slot_data...")
             self.malha_frame.update_slot_data(self.slot_data)
-            print("Alterações salvas com sucesso!")
             
             self.destroy()
         
@@ -1241,11 +1875,8 @@ class EditSlotDialog(Toplevel):
     def cancel(self):
         """Cancela a edição com proteções contra travamentos."""
         try:
-            print("Cancelando edição...")
-            
             # Verifica se a janela já foi destruída
             if hasattr(self, '_is_destroyed') and self._is_destroyed:
-                print("Janela já foi destruída anteriormente")
                 return
             
             # Marca como destruída para evitar múltiplas chamadas
@@ -1259,24 +1890,16 @@ class EditSlotDialog(Toplevel):
             
             # Fecha janela de template se estiver aberta
             if hasattr(self, 'slot_data') and self.slot_data and self.slot_data.get('tipo') == 'clip':
-                try:
-                    cv2.destroyWindow(f"Template - Slot {self.slot_data['id']}")
-                except:
-                    pass  # Ignora erro se janela não existir
+                post_display_command('hide', f"Template - Slot {self.slot_data['id']}")
             
             # Limpa referências
             self.result = None
             if hasattr(self, 'malha_frame'):
                 self.malha_frame = None
             
-            print("Destruindo janela...")
-            
             # Verifica se a janela ainda existe antes de destruir
             if self.winfo_exists():
                 self.destroy()
-                print("Janela destruída com sucesso")
-            else:
-                print("Janela já foi destruída")                
         except Exception as e:
             print(f"Erro ao cancelar: {e}")
             import traceback
@@ -1290,6 +1913,207 @@ class EditSlotDialog(Toplevel):
                 print("Não foi possível destruir a janela na tentativa final")
 
 
+# Executor para decodificar amostras e miniaturas do histórico fora da thread do Tk
+_THUMB_POOL = ThreadPoolExecutor(max_workers=os.cpu_count() or 1)
+
+
+# Buffer BGR reutilizável para a redução das miniaturas, um por thread
+# (Tk, _THUMB_POOL e a thread de gravação geram miniaturas)
+_thumb_scratch = threading.local()
+
+
+def _resize_thumbnail(roi_image):
+    """
+    Reduz a ROI para THUMB_SIZE no buffer da thread atual. O resultado só é
+    válido até a próxima chamada na mesma thread.
+    """
+    shape = (THUMB_SIZE[1], THUMB_SIZE[0]) + roi_image.shape[2:]
+    buf = getattr(_thumb_scratch, 'bgr', None)
+    if buf is None or buf.shape != shape or buf.dtype != roi_image.dtype:
+        buf = _thumb_scratch.bgr = np.empty(shape, dtype=roi_image.dtype)
+    return cv2.resize(roi_image, THUMB_SIZE, dst=buf, interpolation=cv2.INTER_AREA)
+
+
+def _write_thumbnail(roi_image, thumb_path):
+    """Reduz a ROI para THUMB_SIZE, persiste a miniatura em thumb_path e retorna-a (BGR, buffer da thread)."""
+    roi_resized = _resize_thumbnail(roi_image)
+    try:
+        os.makedirs(os.path.dirname(thumb_path), exist_ok=True)
+        # Miniatura pequena: compressão mínima, a gravação é praticamente só cópia
+        cv2.imwrite(thumb_path, roi_resized, [cv2.IMWRITE_PNG_COMPRESSION, 1])
+    except Exception as e:
+        print(f"Erro ao salvar miniatura em cache {thumb_path}: {e}")
+    return roi_resized
+
+
+def _load_thumbnail_rgb(roi_image, sample_path=None, thumb_path=None, dst=None):
+    """Retorna a miniatura RGB (THUMB_SIZE) da amostra, reaproveitando a persistida em thumb_path.
+    
+    Não usa o Tk, então pode rodar em threads de trabalho. Se dst for
+    informado, a conversão para RGB é escrita nele.
+    """
+    if thumb_path is not None:
+        # Miniatura em disco só vale se for mais nova que a amostra
+        sample_mtime = _template_mtime(sample_path)
+        thumb_mtime = _template_mtime(thumb_path)
+        if sample_mtime is not None and thumb_mtime is not None and thumb_mtime >= sample_mtime:
+            cached = cv2.imread(thumb_path)
+            if cached is not None and cached.shape[1::-1] == THUMB_SIZE:
+                return cv2.cvtColor(cached, cv2.COLOR_BGR2RGB, dst=dst)
+    
+    if thumb_path is not None:
+        roi_resized = _write_thumbnail(roi_image, thumb_path)
+    else:
+        roi_resized = _resize_thumbnail(roi_image)
+    return cv2.cvtColor(roi_resized, cv2.COLOR_BGR2RGB, dst=dst)
+
+
+# Fila de gravação das amostras de treinamento, consumida por uma única thread
+# (o cv2.imwrite libera o GIL e não trava o laço do Tk)
+_sample_save_queue = queue.Queue()
+_sample_save_thread = None
+_sample_save_lock = threading.Lock()
+SAMPLE_PNG_COMPRESSION = 3  # ~2x mais rápido que o padrão (9) com arquivos ~10% maiores
+SAMPLE_JPEG_QUALITY = 95    # Amostras JPEG (padrão): codificação bem mais rápida que o DEFLATE do PNG
+SAMPLE_EXTENSIONS = ('.jpg', '.png', '.jpeg')  # Extensões possíveis de uma amostra salva
+_IMG_EXTS = frozenset(ext[1:] for ext in SAMPLE_EXTENSIONS)  # Mesmas extensões, sem o ponto, para busca O(1)
+
+
+def _has_image_ext(filename):
+    """Indica se o nome termina em uma das extensões de amostra (consulta no frozenset)."""
+    ext = filename.rpartition('.')[2]
+    return ext in _IMG_EXTS or ext.lower() in _IMG_EXTS
+
+
+def _sample_write_params(file_path):
+    """Parâmetros do cv2.imwrite conforme o formato da amostra (JPEG ou PNG)."""
+    if file_path.lower().endswith(('.jpg', '.jpeg')):
+        return [cv2.IMWRITE_JPEG_QUALITY, SAMPLE_JPEG_QUALITY, cv2.IMWRITE_JPEG_OPTIMIZE, 0]
+    return [cv2.IMWRITE_PNG_COMPRESSION, SAMPLE_PNG_COMPRESSION]
+
+
+def _sample_save_loop():
+    """Laço da thread de gravação: salva cada amostra enfileirada e, se pedido, sua miniatura."""
+    while True:
+        roi_image, file_path, thumb_path = _sample_save_queue.get()
+        try:
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            if cv2.imwrite(file_path, roi_image, _sample_write_params(file_path)):
+                print(f"Amostra salva em: {file_path}")
+                # Gravada depois da amostra, a miniatura já nasce válida para o próximo carregamento
+                if thumb_path is not None:
+                    _write_thumbnail(roi_image, thumb_path)
+            else:
+                print(f"Erro ao salvar amostra: {file_path}")
+        except Exception as e:
+            print(f"Erro ao salvar amostra {file_path}: {e}")
+        finally:
+            _sample_save_queue.task_done()
+
+
+def save_sample_async(roi_image, file_path, thumb_path=None):
+    """
+    Enfileira a gravação de uma amostra (e da miniatura em thumb_path, se
+    informado), iniciando a thread de gravação no primeiro uso. A ROI não
+    deve ser alterada depois de enfileirada.
+    """
+    global _sample_save_thread
+    with _sample_save_lock:
+        if _sample_save_thread is None:
+            _sample_save_thread = threading.Thread(target=_sample_save_loop, name="sample-writer", daemon=True)
+            _sample_save_thread.start()
+    _sample_save_queue.put((roi_image, file_path, thumb_path))
+
+
+def wait_pending_sample_saves():
+    """Aguarda as gravações de amostras enfileiradas (antes de apagar arquivos, por exemplo)."""
+    _sample_save_queue.join()
+
+
+SAMPLE_PREFIX_LEN = len("ok_sample_")  # Mesmo tamanho para "ng_sample_"
+
+
+def _parse_sample_ts(filename):
+    """
+    Extrai o timestamp de "ok_sample_YYYYMMDD_HHMMSS.ext" por fatiamento
+    (bem mais rápido que strptime). Nomes fora do padrão usam o horário atual.
+    """
+    p = SAMPLE_PREFIX_LEN
+    try:
+        if filename[p + 8] != '_':
+            raise ValueError(filename)
+        return datetime(int(filename[p:p + 4]), int(filename[p + 4:p + 6]), int(filename[p + 6:p + 8]),
+                        int(filename[p + 9:p + 11]), int(filename[p + 11:p + 13]), int(filename[p + 13:p + 15]))
+    except (ValueError, IndexError):
+        return datetime.now()
+
+
+def _remove_dir_files(dir_path, only_images=False):
+    """Remove os arquivos de dir_path (opcionalmente só as imagens de amostra) em uma passada de scandir."""
+    try:
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                if entry.is_file() and (not only_images or _has_image_ext(entry.name)):
+                    os.unlink(entry.path)
+    except FileNotFoundError:
+        pass
+
+
+def _read_sample_image(sample_path):
+    """Lê uma amostra em BGR; JPEGs passam pelo TurboJPEG quando disponível."""
+    if _turbo_jpeg is not None and sample_path.rpartition('.')[2].lower() in ('jpg', 'jpeg'):
+        try:
+            with open(sample_path, 'rb') as f:
+                return _turbo_jpeg.decode(f.read())
+        except Exception as e:
+            print(f"Erro ao decodificar {sample_path} com TurboJPEG, usando OpenCV: {e}")
+    return cv2.imread(sample_path, cv2.IMREAD_COLOR)
+
+
+def _thumb_path_for(samples_dir, sample_path):
+    """Caminho da miniatura persistida de uma amostra (<samples_dir>/.thumbs/<hash>.png)."""
+    rel_path = os.path.relpath(sample_path, samples_dir)
+    digest = hashlib.md5(rel_path.encode('utf-8')).hexdigest()
+    return os.path.join(samples_dir, THUMB_DIR_NAME, f"{digest}.png")
+
+
+def _load_one_sample(samples_dir, sample_path, filename):
+    """
+    Todo o trabalho por arquivo do carregamento, feito na thread do pool: timestamp,
+    leitura da amostra, versão em cinza e miniatura RGB.
+    Retorna (roi, roi_cinza, miniatura, timestamp) ou None se a imagem não abrir.
+    """
+    roi_image = _read_sample_image(sample_path)
+    if roi_image is None:
+        return None
+    roi_gray = cv2.cvtColor(roi_image, cv2.COLOR_BGR2GRAY)
+    thumb_rgb = _load_thumbnail_rgb(roi_image, sample_path, _thumb_path_for(samples_dir, sample_path))
+    return roi_image, roi_gray, thumb_rgb, _parse_sample_ts(filename)
+
+
+NCC_BATCH_SIZE = 64  # ROIs por multiplicação de matrizes em _ncc_batch (limita a memória em float32)
+
+
+def _ncc_batch(template, rois):
+    """
+    TM_CCOEFF_NORMED de várias ROIs do mesmo tamanho do template (o resultado
+    1x1 do matchTemplate), calculado em lote: centraliza, multiplica e normaliza.
+    ROIs ou template constantes resultam em 0, como no OpenCV.
+    """
+    t = template.astype(np.float32).ravel()
+    t -= t.mean()
+    t_norm = np.linalg.norm(t)
+    
+    values = np.empty(len(rois), dtype=np.float64)
+    for start in range(0, len(rois), NCC_BATCH_SIZE):
+        batch = np.stack([roi.ravel() for roi in rois[start:start + NCC_BATCH_SIZE]]).astype(np.float32)
+        batch -= batch.mean(axis=1, keepdims=True)
+        denom = np.linalg.norm(batch, axis=1) * t_norm
+        num = batch @ t
+        values[start:start + len(batch)] = np.divide(num, denom, out=np.zeros_like(num), where=denom > 1e-6)
+    return values
+
+
 class SlotTrainingDialog(Toplevel):
     """Diálogo para treinamento de slots com feedback OK/NG."""
     
@@ -1297,7 +2121,15 @@ class SlotTrainingDialog(Toplevel):
         super().__init__(parent)
         self.slot_data = slot_data
         self.montagem_instance = montagem_instance
-        self.training_samples = []  # Lista de amostras de treinamento
+        self.training_samples = {}  # (rótulo, timestamp) -> amostra, em ordem de inserção
+        self._sample_counts = {"OK": 0, "NG": 0}  # Contadores mantidos a cada inclusão/remoção
+        self._thumb_cache = {}  # (caminho, mtime) -> PhotoImage das miniaturas do histórico
+        self._thumb_buf_rgb = np.empty((THUMB_SIZE[1], THUMB_SIZE[0], 3), dtype=np.uint8)
+        self._pending_loads = []  # Amostras do disco ainda sendo carregadas em segundo plano
+        self._load_after_id = None  # after() que instala o próximo lote carregado
+        
+        # Formato das novas amostras: JPEG por padrão; 'png' (sem perdas) via opção do diálogo, persistido no slot
+        self.sample_ext = '.png' if str(slot_data.get('sample_format', 'jpg')).lower() == 'png' else '.jpg'
         
         # Inicializa classificador ML
         self.ml_classifier = MLSlotClassifier(slot_id=str(slot_data['id']))
@@ -1355,6 +2187,15 @@ class SlotTrainingDialog(Toplevel):
         self.current_image = None
         self.current_roi = None
         
+        # Redesenho do canvas principal agrupado em um único after_idle
+        self._pending_display = None  # (imagem, x, y, w, h) mais recente a exibir
+        self._display_after_id = None
+        self._preview_source = None  # Imagem cujas prévias reduzidas estão em _preview_pyramid
+        self._preview_pyramid = {}   # (largura, altura) do canvas arredondadas -> (prévia, escala)
+        self._preview_item = None    # Item de imagem do canvas reaproveitado entre redesenhos
+        self._canvas_w = self._canvas_h = 1  # Tamanho do canvas informado pelo último <Configure>
+        self._roi_item = None        # Item do retângulo da ROI reaproveitado entre redesenhos
+        
         self.setup_ui()
         self.center_window()
         self.apply_modal_grab()
@@ -1393,6 +2234,9 @@ class SlotTrainingDialog(Toplevel):
             except Exception:
                 pass
             
+            # Amostras ainda na fila de gravação não podem se perder ao fechar
+            wait_pending_sample_saves()
+            
             # Fecha o diálogo
             self.destroy()
         except Exception as e:
@@ -1435,6 +2279,13 @@ class SlotTrainingDialog(Toplevel):
                                       command=self.on_method_change)
         self.radio_ml.pack(side=LEFT, padx=(5, 0))
         
+        # Formato das amostras salvas (persistido no slot)
+        self.lossless_samples_var = ttk.BooleanVar(value=self.sample_ext == '.png')
+        self.check_lossless = ttk.Checkbutton(method_frame, text="Salvar amostras sem perdas (PNG)",
+                                              variable=self.lossless_samples_var,
+                                              command=self.on_sample_format_change)
+        self.check_lossless.pack(side=RIGHT)
+        
         # Botões de captura
         capture_frame = ttk.Frame(controls_frame)
         capture_frame.pack(fill=X, padx=10, pady=10)
@@ -1478,6 +2329,9 @@ class SlotTrainingDialog(Toplevel):
         
         self.canvas.configure(yscrollcommand=v_scrollbar_canvas.set, xscrollcommand=h_scrollbar_canvas.set)
         
+        # Redimensionamentos em sequência viram um único redesenho
+        self.canvas.bind("<Configure>", self._on_canvas_configure)
+        
         # Pack dos elementos do canvas
         self.canvas.grid(row=0, column=0, sticky="nsew")
         v_scrollbar_canvas.grid(row=0, column=1, sticky="ns")
@@ -1507,51 +2361,58 @@ class SlotTrainingDialog(Toplevel):
         self.history_notebook = ttk.Notebook(right_frame)
         self.history_notebook.pack(fill=BOTH, expand=True, padx=10, pady=10)
         
+        # Estado do histórico virtualizado (linhas por rótulo e itens desenhados por índice)
+        self._history_rows = {"OK": [], "NG": []}
+        self._rendered = {"OK": {}, "NG": {}}
+        self._button_pool = {"OK": [], "NG": []}
+        self._wheel_pending = {"OK": 0, "NG": 0}  # Passos de rolagem acumulados até o próximo ciclo ocioso
+        self._tab_populated = {"OK": True, "NG": False}  # Abas só desenham linhas depois de exibidas
+        self._history_font = tkfont.Font(self, family="Arial", size=9)  # Fonte única dos textos das linhas
+        self._history_text_color = get_color('colors.special_colors.console_fg')
+        self._history_row_bg = {"OK": get_color('colors.special_colors.ok_result_bg'),
+                                "NG": get_color('colors.special_colors.ng_result_bg')}
+        
         # Aba OK
         self.ok_frame = ttk.Frame(self.history_notebook)
         self.history_notebook.add(self.ok_frame, text="✅ Amostras OK (0)")
         
-        # Scrollable frame para amostras OK
+        # Canvas virtualizado para amostras OK: só as linhas visíveis viram itens/widgets
         self.ok_canvas = Canvas(self.ok_frame, bg=get_color('colors.special_colors.ok_canvas_bg'))  # Cor específica para OK
         self.ok_scrollbar = ttk.Scrollbar(self.ok_frame, orient="vertical", command=self.ok_canvas.yview)
-        self.ok_scrollable_frame = ttk.Frame(self.ok_canvas)
-        
-        self.ok_scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.ok_canvas.configure(scrollregion=self.ok_canvas.bbox("all"))
-        )
         
-        self.ok_canvas.create_window((0, 0), window=self.ok_scrollable_frame, anchor="nw")
-        self.ok_canvas.configure(yscrollcommand=self.ok_scrollbar.set)
+        # Qualquer mudança de visão (scrollbar, roda do mouse) redesenha as linhas visíveis
+        self.ok_canvas.configure(yscrollcommand=partial(self._on_history_scroll, "OK"))
+        self.ok_canvas.bind("<Configure>", lambda e: self._on_history_resize("OK"))
         
         self.ok_canvas.pack(side="left", fill="both", expand=True)
         self.ok_scrollbar.pack(side="right", fill="y")
         
         # Adiciona suporte para scroll com mouse wheel
-        self.ok_canvas.bind("<MouseWheel>", lambda e: self.ok_canvas.yview_scroll(int(-1*(e.delta/120)), "units"))
+        self.ok_canvas.bind("<MouseWheel>", partial(self._on_history_wheel, "OK"))
         
         # Aba NG
         self.ng_frame = ttk.Frame(self.history_notebook)
         self.history_notebook.add(self.ng_frame, text="❌ Amostras NG (0)")
         
-        # Scrollable frame para amostras NG
+        # Canvas virtualizado para amostras NG: só as linhas visíveis viram itens/widgets
         self.ng_canvas = Canvas(self.ng_frame, bg=get_color('colors.special_colors.ng_canvas_bg'))  # Cor específica para NG
         self.ng_scrollbar = ttk.Scrollbar(self.ng_frame, orient="vertical", command=self.ng_canvas.yview)
-        self.ng_scrollable_frame = ttk.Frame(self.ng_canvas)
         
-        self.ng_scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.ng_canvas.configure(scrollregion=self.ng_canvas.bbox("all"))
-        )
-        
-        self.ng_canvas.create_window((0, 0), window=self.ng_scrollable_frame, anchor="nw")
-        self.ng_canvas.configure(yscrollcommand=self.ng_scrollbar.set)
+        # Qualquer mudança de visão (scrollbar, roda do mouse) redesenha as linhas visíveis
+        self.ng_canvas.configure(yscrollcommand=partial(self._on_history_scroll, "NG"))
+        self.ng_canvas.bind("<Configure>", lambda e: self._on_history_resize("NG"))
         
         self.ng_canvas.pack(side="left", fill="both", expand=True)
         self.ng_scrollbar.pack(side="right", fill="y")
         
         # Adiciona suporte para scroll com mouse wheel
-        self.ng_canvas.bind("<MouseWheel>", lambda e: self.ng_canvas.yview_scroll(int(-1*(e.delta/120)), "units"))
+        self.ng_canvas.bind("<MouseWheel>", partial(self._on_history_wheel, "NG"))
+        
+        self._history_canvases = {"OK": self.ok_canvas, "NG": self.ng_canvas}
+        
+        # A aba NG só desenha suas linhas quando é selecionada pela primeira vez
+        self.history_notebook.bind("<<NotebookTabChanged>>", self._on_history_tab_changed)
+        self._history_scrollbars = {"OK": self.ok_scrollbar, "NG": self.ng_scrollbar}
         # Frame inferior - informações e ações
         bottom_frame = ttk.Frame(main_frame)
         bottom_frame.pack(fill=X, pady=(10, 0))
@@ -1567,6 +2428,11 @@ class SlotTrainingDialog(Toplevel):
                                    font=("Arial", 10, "bold"))
         self.info_label.pack(side=LEFT)
         
+        # Confirmação não modal das amostras marcadas (some sozinha)
+        self._status_label = ttk.Label(stats_frame, text="", font=("Arial", 10, "bold"))
+        self._status_label.pack(side=LEFT, padx=(20, 0))
+        self._status_after_id = None
+        
         self.threshold_label = ttk.Label(stats_frame, text="Threshold atual: N/A", 
                                         font=("Arial", 10))
         self.threshold_label.pack(side=RIGHT)
@@ -1608,11 +2474,19 @@ class SlotTrainingDialog(Toplevel):
         """Captura imagem da webcam para treinamento usando frame em segundo plano quando disponível."""
         try:
             # Preferir o frame em segundo plano da janela de montagem para evitar mexer no driver
-            if (hasattr(self.montagem_instance, 'live_capture') and 
-                self.montagem_instance.live_capture and 
-                hasattr(self.montagem_instance, 'latest_frame') and 
-                self.montagem_instance.latest_frame is not None):
-                captured_image = self.montagem_instance.latest_frame.copy()
+            latest_frame = None
+            live_capture = getattr(self.montagem_instance, 'live_capture', False)
+            if live_capture:
+                if hasattr(self.montagem_instance, 'get_latest_frame'):
+                    latest_frame = self.montagem_instance.get_latest_frame()
+                else:
+                    latest_frame = getattr(self.montagem_instance, 'latest_frame', None)
+                if latest_frame is None:
+                    # A câmera já está aberta pela montagem: não abre o dispositivo de novo
+                    messagebox.showwarning("Aviso", "Nenhum frame da câmera ainda. Tente novamente em instantes.")
+                    return
+            if latest_frame is not None:
+                captured_image = latest_frame.copy()
                 print("Usando frame de segundo plano da montagem para captura de treinamento")
             else:
                 # Fallback: usa cache de câmera (não reinicia o driver)
@@ -1620,7 +2494,8 @@ class SlotTrainingDialog(Toplevel):
                 if hasattr(self.montagem_instance, 'camera_combo') and self.montagem_instance.camera_combo.get():
                     camera_index = int(self.montagem_instance.camera_combo.get())
                 print("Captura em segundo plano indisponível, usando cache da câmera para captura pontual")
-                captured_image = capture_image_from_camera(camera_index, use_cache=True)
+                # process_captured_image copia o que precisa manter, então o buffer pode ser reutilizado
+                captured_image = capture_image_from_camera(camera_index, use_cache=True, reuse_buffer=True)
             
             if captured_image is not None:
                 self.process_captured_image(captured_image)
@@ -1677,11 +2552,12 @@ class SlotTrainingDialog(Toplevel):
                 
                 transformed_corners = cv2.perspectiveTransform(original_corners, M)[0]
                 
-                # Calcula bounding box
-                x = int(min(corner[0] for corner in transformed_corners))
-                y = int(min(corner[1] for corner in transformed_corners))
-                w = int(max(corner[0] for corner in transformed_corners) - x)
-                h = int(max(corner[1] for corner in transformed_corners) - y)
+                # Calcula bounding box (uma redução por eixo)
+                corners_min = transformed_corners.min(axis=0)
+                corners_max = transformed_corners.max(axis=0)
+                x, y = int(corners_min[0]), int(corners_min[1])
+                w = int(corners_max[0] - x)
+                h = int(corners_max[1] - y)
             
             # Valida e ajusta coordenadas
             x = max(0, x)
@@ -1696,8 +2572,9 @@ class SlotTrainingDialog(Toplevel):
             # Extrai ROI
             self.current_roi = image[y:y+h, x:x+w].copy()
             
-            # Exibe a imagem com a ROI destacada
-            self.display_image_with_roi(image, x, y, w, h)
+            # Exibe a imagem com a ROI destacada (usa a cópia própria: o redesenho é adiado
+            # e `image` pode ser o buffer reutilizado da câmera)
+            self.display_image_with_roi(self.current_image, x, y, w, h)
             
             # Habilita botões de feedback
             self.btn_mark_ok.config(state=NORMAL)
@@ -1707,22 +2584,32 @@ class SlotTrainingDialog(Toplevel):
             messagebox.showerror("Erro", f"Erro ao processar imagem: {str(e)}")
             
     def display_image_with_roi(self, image, roi_x, roi_y, roi_w, roi_h):
-        """Exibe a imagem com a ROI destacada no canvas."""
+        """Agenda a exibição da imagem com a ROI destacada; chamadas em sequência geram um só redesenho."""
+        self._pending_display = (image, roi_x, roi_y, roi_w, roi_h)
+        self._schedule_display()
+    
+    def _on_canvas_configure(self, event):
+        """Guarda o novo tamanho do canvas e agenda o redesenho."""
+        self._canvas_w, self._canvas_h = event.width, event.height
+        self._schedule_display()
+    
+    def _schedule_display(self):
+        """Agenda _do_display para o próximo ciclo ocioso, se ainda não houver um pendente."""
+        if self._pending_display is not None and self._display_after_id is None:
+            self._display_after_id = self.after_idle(self._do_display)
+    
+    def _do_display(self):
+        """Exibe no canvas o estado mais recente registrado por display_image_with_roi."""
+        self._display_after_id = None
+        if self._pending_display is None:
+            return
+        image, roi_x, roi_y, roi_w, roi_h = self._pending_display
         try:
-            # Cria cópia da imagem para desenhar
-            display_image = image.copy()
-            
-            # Desenha retângulo da ROI
-            cv2.rectangle(display_image, (roi_x, roi_y), (roi_x + roi_w, roi_y + roi_h), (0, 255, 0), 3)
-            
             # === AJUSTE AUTOMÁTICO AO CANVAS ===
             try:
-                # Força atualização do canvas
-                self.canvas.update_idletasks()
-                
-                # Obtém o tamanho atual do canvas
-                canvas_width = self.canvas.winfo_width()
-                canvas_height = self.canvas.winfo_height()
+                # Tamanho atual do canvas, mantido pelo <Configure> (sem consultar a geometria)
+                canvas_width = self._canvas_w
+                canvas_height = self._canvas_h
                 
                 # Se o canvas ainda não foi renderizado, usa valores baseados na janela
                 if canvas_width <= 1 or canvas_height <= 1:
@@ -1739,13 +2626,27 @@ class SlotTrainingDialog(Toplevel):
                 canvas_width = 800
                 canvas_height = 400
             
-            # Converte para exibição no canvas
-            tk_image, _ = cv2_to_tk(display_image, max_w=canvas_width, max_h=canvas_height)
+            # Converte para exibição no canvas a partir da prévia já reduzida (sem novo resize)
+            preview, scale = self._get_preview(image, canvas_width, canvas_height)
+            tk_image, _ = cv2_to_tk(preview, scale_percent=100)
             
-            # Limpa canvas e exibe imagem
-            self.canvas.delete("all")
-            self.canvas.create_image(self.canvas.winfo_width()//2, self.canvas.winfo_height()//2, 
-                                   image=tk_image, anchor="center")
+            # Exibe a imagem reaproveitando os itens do canvas (criados só no primeiro redesenho)
+            center_x, center_y = canvas_width // 2, canvas_height // 2
+            if self._preview_item is None:
+                self._preview_item = self.canvas.create_image(center_x, center_y, image=tk_image, anchor="center")
+            else:
+                self.canvas.itemconfig(self._preview_item, image=tk_image)
+                self.canvas.coords(self._preview_item, center_x, center_y)
+            
+            # Retângulo da ROI como item do canvas, já na escala de exibição
+            offset_x = center_x - tk_image.width() // 2
+            offset_y = center_y - tk_image.height() // 2
+            roi_coords = (offset_x + int(roi_x * scale), offset_y + int(roi_y * scale),
+                          offset_x + int((roi_x + roi_w) * scale), offset_y + int((roi_y + roi_h) * scale))
+            if self._roi_item is None:
+                self._roi_item = self.canvas.create_rectangle(*roi_coords, outline="#00ff00", width=3)
+            else:
+                self.canvas.coords(self._roi_item, *roi_coords)
             
             # Mantém referência da imagem
             self.canvas.image = tk_image
@@ -1753,171 +2654,315 @@ class SlotTrainingDialog(Toplevel):
         except Exception as e:
             print(f"Erro ao exibir imagem: {e}")
             
+    def _get_preview(self, image, canvas_width, canvas_height):
+        """
+        Retorna (prévia, escala) da imagem para o tamanho do canvas, arredondado
+        para baixo em múltiplos de PREVIEW_SIZE_STEP. As prévias ficam em cache
+        enquanto a imagem exibida for a mesma.
+        """
+        if self._preview_source is not image:
+            self._preview_source = image
+            self._preview_pyramid.clear()
+        
+        target_w = max(PREVIEW_SIZE_STEP, canvas_width // PREVIEW_SIZE_STEP * PREVIEW_SIZE_STEP)
+        target_h = max(PREVIEW_SIZE_STEP, canvas_height // PREVIEW_SIZE_STEP * PREVIEW_SIZE_STEP)
+        cached = self._preview_pyramid.get((target_w, target_h))
+        if cached is not None:
+            return cached
+        
+        # Mesma regra de cv2_to_tk: a maior escala preenche toda a área disponível
+        h, w = image.shape[:2]
+        scale = max(target_w / w, target_h / h)
+        interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_LINEAR
+        preview = cv2.resize(image, (max(1, int(w * scale)), max(1, int(h * scale))),
+                             interpolation=interpolation)
+        
+        if len(self._preview_pyramid) >= PREVIEW_CACHE_MAX_ENTRIES:
+            self._preview_pyramid.clear()
+        self._preview_pyramid[(target_w, target_h)] = (preview, scale)
+        return preview, scale
+    
     def mark_as_ok(self):
         """Marca a amostra atual como OK."""
         if self.current_roi is not None:
             timestamp = datetime.now()
-            self.training_samples.append({
-                'roi': self.current_roi.copy(),
-                'label': 'OK',
-                'timestamp': timestamp
-            })
+            # self.current_roi já é uma cópia própria e é transferida aqui (reset_capture_state a
+            # descarta); ninguém a altera depois, então lista, gravação e histórico a compartilham
+            roi = self.current_roi
+            self._add_training_sample(roi, "OK", timestamp)
             
-            # Salva a amostra em disco
+            # Salva a amostra em disco (em segundo plano; o diretório é criado pela thread de gravação)
+            file_path = None
             if self.samples_dir:
                 try:
-                    # Cria diretório se não existir
-                    ok_dir = os.path.join(self.samples_dir, "ok")
-                    os.makedirs(ok_dir, exist_ok=True)
-                    
                     # Formata o timestamp para o nome do arquivo
                     timestamp_str = timestamp.strftime("%Y%m%d_%H%M%S")
-                    filename = f"ok_sample_{timestamp_str}.png"
-                    file_path = os.path.join(ok_dir, filename)
+                    filename = f"ok_sample_{timestamp_str}{self.sample_ext}"
+                    file_path = os.path.join(self.samples_dir, "ok", filename)
                     
-                    # Salva a imagem
-                    cv2.imwrite(file_path, self.current_roi.copy())
-                    print(f"Amostra OK salva em: {file_path}")
+                    # Enfileira a gravação da imagem
+                    save_sample_async(roi, file_path, self._thumb_cache_path(file_path))
                 except Exception as e:
                     print(f"Erro ao salvar amostra OK: {e}")
             
             # Adiciona ao histórico visual
-            self.add_sample_to_history(self.current_roi.copy(), "OK", timestamp)
+            self.add_sample_to_history(roi, "OK", timestamp, file_path)
             
             self.update_info_label()
             self.update_tab_titles()
             self.reset_capture_state()
-            messagebox.showinfo("Sucesso", "Amostra marcada como OK!")
+            self._flash_status("✅ Amostra OK salva", ok=True)
             
     def mark_as_ng(self):
         """Marca a amostra atual como NG."""
         if self.current_roi is not None:
             timestamp = datetime.now()
-            self.training_samples.append({
-                'roi': self.current_roi.copy(),
-                'label': 'NG',
-                'timestamp': timestamp
-            })
+            # self.current_roi já é uma cópia própria e é transferida aqui (reset_capture_state a
+            # descarta); ninguém a altera depois, então lista, gravação e histórico a compartilham
+            roi = self.current_roi
+            self._add_training_sample(roi, "NG", timestamp)
             
-            # Salva a amostra em disco
+            # Salva a amostra em disco (em segundo plano; o diretório é criado pela thread de gravação)
+            file_path = None
             if self.samples_dir:
                 try:
-                    # Cria diretório se não existir
-                    ng_dir = os.path.join(self.samples_dir, "ng")
-                    os.makedirs(ng_dir, exist_ok=True)
-                    
                     # Formata o timestamp para o nome do arquivo
                     timestamp_str = timestamp.strftime("%Y%m%d_%H%M%S")
-                    filename = f"ng_sample_{timestamp_str}.png"
-                    file_path = os.path.join(ng_dir, filename)
+                    filename = f"ng_sample_{timestamp_str}{self.sample_ext}"
+                    file_path = os.path.join(self.samples_dir, "ng", filename)
                     
-                    # Salva a imagem
-                    cv2.imwrite(file_path, self.current_roi.copy())
-                    print(f"Amostra NG salva em: {file_path}")
+                    # Enfileira a gravação da imagem
+                    save_sample_async(roi, file_path, self._thumb_cache_path(file_path))
                 except Exception as e:
                     print(f"Erro ao salvar amostra NG: {e}")
             
             # Adiciona ao histórico visual
-            self.add_sample_to_history(self.current_roi.copy(), "NG", timestamp)
+            self.add_sample_to_history(roi, "NG", timestamp, file_path)
             
             self.update_info_label()
             self.update_tab_titles()
             self.reset_capture_state()
-            messagebox.showinfo("Sucesso", "Amostra marcada como NG!")
+            self._flash_status("❌ Amostra NG salva", ok=False)
             
+    def _flash_status(self, message, ok=True, duration_ms=1500):
+        """Exibe uma mensagem temporária no rodapé sem abrir um diálogo modal."""
+        self._status_label.config(text=message,
+                                  foreground=get_color('colors.ok_color' if ok else 'colors.ng_color'))
+        if self._status_after_id is not None:
+            self.after_cancel(self._status_after_id)
+        self._status_after_id = self.after(duration_ms, self._clear_status)
+    
+    def _clear_status(self):
+        """Limpa a mensagem temporária do rodapé."""
+        self._status_after_id = None
+        self._status_label.config(text="")
+    
     def reset_capture_state(self):
         """Reseta o estado de captura."""
         self.current_image = None
         self.current_roi = None
+        self._pending_display = None
+        self._preview_source = None
+        self._preview_pyramid.clear()
+        self._preview_item = self._roi_item = None  # Apagados pelo delete("all") abaixo
+        if self._display_after_id is not None:
+            self.after_cancel(self._display_after_id)
+            self._display_after_id = None
         self.btn_mark_ok.config(state=DISABLED)
         self.btn_mark_ng.config(state=DISABLED)
         self.canvas.delete("all")
         
-    def add_sample_to_history(self, roi_image, label, timestamp):
+    def _thumb_cache_path(self, sample_path):
+        """Retorna o caminho da miniatura persistida de uma amostra (<samples_dir>/.thumbs/<hash>.png)."""
+        return _thumb_path_for(self.samples_dir, sample_path)
+    
+    def _get_thumbnail(self, roi_image, sample_path=None, thumb_rgb=None):
+        """Retorna a PhotoImage da miniatura, reaproveitando o cache em memória e em disco."""
+        cache_key = None
+        thumb_path = None
+        if sample_path and self.samples_dir:
+            sample_mtime = _template_mtime(sample_path)
+            if sample_mtime is not None:
+                cache_key = (sample_path, sample_mtime)
+                cached = self._thumb_cache.get(cache_key)
+                if cached is not None:
+                    return cached
+                thumb_path = self._thumb_cache_path(sample_path)
+        
+        if thumb_rgb is None:
+            # A PhotoImage copia os pixels, então o buffer RGB do diálogo pode ser reaproveitado
+            thumb_rgb = _load_thumbnail_rgb(roi_image, sample_path, thumb_path, dst=self._thumb_buf_rgb)
+        
+        roi_tk = ImageTk.PhotoImage(Image.fromarray(thumb_rgb))
+        if cache_key is not None:
+            self._thumb_cache[cache_key] = roi_tk
+        return roi_tk
+    
+    def add_sample_to_history(self, roi_image, label, timestamp, sample_path=None, thumb_rgb=None):
         """Adiciona uma amostra ao histórico visual."""
         try:
-            # Redimensiona a imagem para miniatura (100x100)
-            thumbnail_size = (100, 100)
-            roi_resized = cv2.resize(roi_image, thumbnail_size)
-            
-            # Converte para formato Tkinter
-            roi_rgb = cv2.cvtColor(roi_resized, cv2.COLOR_BGR2RGB)
-            roi_pil = Image.fromarray(roi_rgb)
-            roi_tk = ImageTk.PhotoImage(roi_pil)
-            
-            # Seleciona o frame correto
-            if label == "OK":
-                parent_frame = self.ok_scrollable_frame
-                bg_color = get_color('colors.special_colors.ok_result_bg')
-            else:
-                parent_frame = self.ng_scrollable_frame
-                bg_color = get_color('colors.special_colors.ng_result_bg')
-            
-            # Cria frame para a amostra
-            sample_frame = ttk.Frame(parent_frame)
-            sample_frame.pack(fill=X, padx=5, pady=2)
-            
-            # Frame interno com borda colorida
-            inner_frame = ttk.Frame(sample_frame, relief="solid", borderwidth=1)
-            inner_frame.pack(fill=X, padx=2, pady=2)
-            
-            # Frame para imagem e informações
-            content_frame = ttk.Frame(inner_frame)
-            content_frame.pack(fill=X, padx=5, pady=5)
-            
-            # Label para a imagem
-            img_label = ttk.Label(content_frame, image=roi_tk)
-            img_label.image = roi_tk  # Mantém referência
-            img_label.pack(side=LEFT, padx=(0, 10))
-            
-            # Frame para informações
-            info_frame = ttk.Frame(content_frame)
-            info_frame.pack(side=LEFT, fill=BOTH, expand=True)
-            
-            # Informações da amostra
-            time_str = timestamp.strftime("%H:%M:%S")
-            date_str = timestamp.strftime("%d/%m/%Y")
-            
-            ttk.Label(info_frame, text=f"🕒 {time_str}", font=("Arial", 9)).pack(anchor="w")
-            ttk.Label(info_frame, text=f"📅 {date_str}", font=("Arial", 8)).pack(anchor="w")
-            ttk.Label(info_frame, text=f"📏 {roi_image.shape[1]}x{roi_image.shape[0]}", 
-                     font=("Arial", 8)).pack(anchor="w")
-            
-            # Botão para remover amostra
-            remove_btn = ttk.Button(info_frame, text="🗑️", width=3,
-                                   command=lambda: self.remove_sample_from_history(sample_frame, label, timestamp))
-            remove_btn.pack(anchor="e", pady=(5, 0))
+            # A linha só vira itens no canvas (e a miniatura só vira PhotoImage)
+            # quando entra no viewport de uma aba já exibida
+            self._history_rows[label].append({
+                'thumb': None,
+                'roi': roi_image,
+                'sample_path': sample_path,
+                'thumb_rgb': thumb_rgb,
+                'timestamp': timestamp,
+                # Texto da linha formatado uma única vez (strftime não roda a cada rolagem)
+                'info_text': f"🕒 {timestamp.strftime('%H:%M:%S')}\n"
+                             f"📅 {timestamp.strftime('%d/%m/%Y')}\n"
+                             f"📏 {roi_image.shape[1]}x{roi_image.shape[0]}"
+            })
+            self._update_history_scrollregion(label)
+            self._refresh_visible(label)
             
         except Exception as e:
             print(f"Erro ao adicionar amostra ao histórico: {e}")
     
-    def remove_sample_from_history(self, sample_frame, label, timestamp):
+    def _update_history_scrollregion(self, label):
+        """Ajusta a área de rolagem à quantidade de linhas, sem depender de widgets."""
+        canvas = self._history_canvases[label]
+        total_height = len(self._history_rows[label]) * HISTORY_ROW_HEIGHT
+        canvas.configure(scrollregion=(0, 0, canvas.winfo_width(), total_height))
+    
+    def _on_history_scroll(self, label, first, last):
+        """yscrollcommand dos canvases do histórico: atualiza a scrollbar e as linhas visíveis."""
+        self._history_scrollbars[label].set(first, last)
+        self._refresh_visible(label)
+    
+    def _on_history_tab_changed(self, event=None):
+        """Na primeira exibição de uma aba do histórico, desenha suas linhas visíveis."""
+        label = "OK" if self.history_notebook.index("current") == 0 else "NG"
+        if not self._tab_populated[label]:
+            self._tab_populated[label] = True
+            self._update_history_scrollregion(label)
+            self._refresh_visible(label)
+    
+    def _on_history_wheel(self, label, event):
+        """Acumula os passos da roda do mouse e rola uma única vez por ciclo ocioso."""
+        # Só o sinal importa: os eventos chegam em múltiplos de ±120
+        pending = self._wheel_pending[label]
+        self._wheel_pending[label] = pending + (-1 if event.delta > 0 else 1)
+        if pending == 0:
+            self.after_idle(self._flush_history_wheel, label)
+    
+    def _flush_history_wheel(self, label):
+        """Aplica de uma vez a rolagem acumulada por _on_history_wheel."""
+        steps = self._wheel_pending[label]
+        self._wheel_pending[label] = 0
+        if steps:
+            self._history_canvases[label].yview_scroll(steps, "units")
+    
+    def _on_history_resize(self, label):
+        """Redesenha todas as linhas visíveis quando a largura do canvas muda."""
+        self._clear_rendered(label)
+        self._update_history_scrollregion(label)
+        self._refresh_visible(label)
+    
+    def _refresh_visible(self, label):
+        """Desenha apenas as linhas que cruzam o viewport e descarta as que saíram dele."""
+        if not self._tab_populated[label]:
+            return
+        
+        canvas = self._history_canvases[label]
+        rows = self._history_rows[label]
+        rendered = self._rendered[label]
+        
+        top = canvas.canvasy(0)
+        bottom = top + canvas.winfo_height()
+        visible = range(max(0, int(top // HISTORY_ROW_HEIGHT)),
+                        min(len(rows), int(bottom // HISTORY_ROW_HEIGHT) + 1))
+        
+        for idx in [idx for idx in rendered if idx not in visible]:
+            self._release_row(label, rendered.pop(idx))
+        for idx in visible:
+            if idx not in rendered:
+                rendered[idx] = self._render_row(label, idx, rows[idx])
+    
+    def _render_row(self, label, idx, row):
+        """Cria os itens de canvas de uma linha do histórico e retorna (ids, botão)."""
+        canvas = self._history_canvases[label]
+        width = max(canvas.winfo_width(), 2 * HISTORY_ROW_HEIGHT)
+        y = idx * HISTORY_ROW_HEIGHT
+        timestamp = row['timestamp']
+        
+        if row['thumb'] is None:
+            # Miniatura (100x100) vinda do cache quando a amostra já está em disco
+            row['thumb'] = self._get_thumbnail(row['roi'], row['sample_path'], row['thumb_rgb'])
+            row['roi'] = row['thumb_rgb'] = None
+        
+        item_ids = [
+            canvas.create_rectangle(5, y + 4, width - 5, y + HISTORY_ROW_HEIGHT - 4,
+                                    fill=self._history_row_bg[label], outline="#888888"),
+            canvas.create_image(12, y + 10, image=row['thumb'], anchor=NW),
+            canvas.create_text(124, y + 12, anchor=NW, font=self._history_font,
+                               fill=self._history_text_color, text=row['info_text'])
+        ]
+        
+        # Botão de remoção reciclado do pool (create_window em vez de um frame por amostra)
+        pool = self._button_pool[label]
+        remove_btn = pool.pop() if pool else ttk.Button(canvas, text="🗑️", width=3)
+        remove_btn.configure(command=lambda: self.remove_sample_from_history(label, timestamp))
+        item_ids.append(canvas.create_window(width - 12, y + HISTORY_ROW_HEIGHT - 10,
+                                             window=remove_btn, anchor="se"))
+        return item_ids, remove_btn
+    
+    def _release_row(self, label, rendered_row):
+        """Apaga os itens de uma linha e devolve o botão ao pool."""
+        item_ids, remove_btn = rendered_row
+        self._history_canvases[label].delete(*item_ids)
+        self._button_pool[label].append(remove_btn)
+    
+    def _clear_rendered(self, label):
+        """Descarta todos os itens desenhados de um histórico."""
+        rendered = self._rendered[label]
+        for rendered_row in rendered.values():
+            self._release_row(label, rendered_row)
+        rendered.clear()
+    
+    def remove_sample_from_history(self, label, timestamp):
         """Remove uma amostra do histórico visual e da lista."""
         try:
             # Remove da lista de amostras
-            self.training_samples = [s for s in self.training_samples 
-                                   if not (s['label'] == label and s['timestamp'] == timestamp)]
+            if self.training_samples.pop((label, timestamp), None) is not None:
+                self._sample_counts[label] -= 1
             
             # Remove o arquivo de amostra do disco
             if self.samples_dir:
                 try:
+                    # A amostra pode ainda estar na fila de gravação
+                    wait_pending_sample_saves()
+                    
                     # Determina o diretório correto (ok ou ng)
                     sample_dir = os.path.join(self.samples_dir, "ok" if label == "OK" else "ng")
                     if os.path.exists(sample_dir):
                         # Formata o timestamp para o nome do arquivo
                         timestamp_str = timestamp.strftime("%Y%m%d_%H%M%S")
-                        filename = f"{label.lower()}_sample_{timestamp_str}.png"
-                        file_path = os.path.join(sample_dir, filename)
                         
-                        # Remove o arquivo se existir
-                        if os.path.exists(file_path):
-                            os.remove(file_path)
-                            print(f"Arquivo de amostra removido: {file_path}")
+                        # A amostra pode ter sido salva em qualquer formato (JPEG ou PNG legado)
+                        for ext in SAMPLE_EXTENSIONS:
+                            filename = f"{label.lower()}_sample_{timestamp_str}{ext}"
+                            file_path = os.path.join(sample_dir, filename)
+                            
+                            # Remove o arquivo se existir
+                            if os.path.exists(file_path):
+                                os.remove(file_path)
+                                print(f"Arquivo de amostra removido: {file_path}")
+                            
+                            # Remove a miniatura persistida da amostra
+                            thumb_path = self._thumb_cache_path(file_path)
+                            if os.path.exists(thumb_path):
+                                os.remove(thumb_path)
                 except Exception as e:
                     print(f"Erro ao remover arquivo de amostra: {e}")
             
-            # Remove o frame visual
-            sample_frame.destroy()
+            # Remove a linha visual; os índices seguintes mudam, então redesenha o viewport
+            rows = self._history_rows[label]
+            rows[:] = [row for row in rows if row['timestamp'] != timestamp]
+            self._clear_rendered(label)
+            self._update_history_scrollregion(label)
+            self._refresh_visible(label)
             
             # Atualiza contadores
             self.update_info_label()
@@ -1926,43 +2971,56 @@ class SlotTrainingDialog(Toplevel):
         except Exception as e:
             print(f"Erro ao remover amostra: {e}")
     
+    def _add_training_sample(self, roi_image, label, timestamp, roi_gray=None):
+        """
+        Registra uma amostra de treinamento e atualiza o contador do rótulo.
+        A versão em cinza (usada pelo limiar e pelo template) é guardada junto.
+        """
+        key = (label, timestamp)
+        if key not in self.training_samples:
+            self._sample_counts[label] += 1
+        if roi_gray is None:
+            roi_gray = cv2.cvtColor(roi_image, cv2.COLOR_BGR2GRAY)
+        self.training_samples[key] = {
+            'roi': roi_image,
+            'roi_gray': roi_gray,
+            'label': label,
+            'timestamp': timestamp
+        }
+    
     def update_tab_titles(self):
         """Atualiza os títulos das abas com o número de amostras."""
-        ok_count = sum(1 for sample in self.training_samples if sample['label'] == 'OK')
-        ng_count = sum(1 for sample in self.training_samples if sample['label'] == 'NG')
-        
-        self.history_notebook.tab(0, text=f"✅ Amostras OK ({ok_count})")
-        self.history_notebook.tab(1, text=f"❌ Amostras NG ({ng_count})")
+        self.history_notebook.tab(0, text=f"✅ Amostras OK ({self._sample_counts['OK']})")
+        self.history_notebook.tab(1, text=f"❌ Amostras NG ({self._sample_counts['NG']})")
     
     def clear_training_history(self):
         """Limpa todo o histórico de treinamento."""
         if messagebox.askyesno("Confirmar", "Deseja realmente limpar todo o histórico de treinamento?"):
+            # Interrompe o carregamento das amostras do disco, se ainda em andamento
+            self._cancel_sample_loading()
+            
             # Limpa a lista de amostras
             self.training_samples.clear()
+            self._sample_counts = {"OK": 0, "NG": 0}
+            self._thumb_cache.clear()
             
-            # Limpa os frames visuais
-            for widget in self.ok_scrollable_frame.winfo_children():
-                widget.destroy()
-            for widget in self.ng_scrollable_frame.winfo_children():
-                widget.destroy()
+            # Limpa as linhas visuais
+            for label in ("OK", "NG"):
+                self._history_rows[label].clear()
+                self._clear_rendered(label)
+                self._update_history_scrollregion(label)
             
             # Remove arquivos de amostra do disco
             if self.samples_dir:
                 try:
-                    # Remove amostras OK
-                    ok_dir = os.path.join(self.samples_dir, "ok")
-                    if os.path.exists(ok_dir):
-                        for filename in os.listdir(ok_dir):
-                            if filename.lower().endswith(('.png', '.jpg', '.jpeg')):
-                                os.remove(os.path.join(ok_dir, filename))
+                    # Amostras ainda na fila de gravação também devem ser removidas
+                    wait_pending_sample_saves()
+                    
+                    # Remove amostras OK/NG e miniaturas persistidas
+                    for label in ("ok", "ng"):
+                        _remove_dir_files(os.path.join(self.samples_dir, label), only_images=True)
+                    _remove_dir_files(os.path.join(self.samples_dir, THUMB_DIR_NAME))
                     
-                    # Remove amostras NG
-                    ng_dir = os.path.join(self.samples_dir, "ng")
-                    if os.path.exists(ng_dir):
-                        for filename in os.listdir(ng_dir):
-                            if filename.lower().endswith(('.png', '.jpg', '.jpeg')):
-                                os.remove(os.path.join(ng_dir, filename))
-                                
                     print("Arquivos de amostra removidos do disco")
                 except Exception as e:
                     print(f"Erro ao remover arquivos de amostra: {e}")
@@ -1973,96 +3031,109 @@ class SlotTrainingDialog(Toplevel):
             
             messagebox.showinfo("Sucesso", "Histórico de treinamento limpo!")
     
-    def load_existing_samples(self):
-        """Carrega amostras existentes do diretório de treinamento."""
+    def load_existing_samples(self):
+        """Carrega amostras existentes do diretório de treinamento."""
+        try:
+            # Verifica se o diretório de amostras foi definido
+            if not self.samples_dir:
+                print("Diretório de amostras não definido. Pulando carregamento de amostras existentes.")
+                return
+            
+            # Todo o trabalho por arquivo roda no _THUMB_POOL; só a PhotoImage é criada na thread do Tk
+            pending = []
+            for label in ("OK", "NG"):
+                try:
+                    # scandir já traz nome, caminho e tipo de cada entrada
+                    with os.scandir(os.path.join(self.samples_dir, label.lower())) as it:
+                        entries = sorted(it, key=lambda entry: entry.name)
+                except FileNotFoundError:
+                    continue
+                for entry in entries:
+                    filename = entry.name
+                    if not _has_image_ext(filename) or not entry.is_file():
+                        continue
+                    future = _THUMB_POOL.submit(_load_one_sample, self.samples_dir, entry.path, filename)
+                    pending.append((future, label, filename, entry.path))
+            
+            self._pending_loads = pending
+            self._install_loaded_samples(pending)
+            
+        except Exception as e:
+            print(f"Erro ao carregar amostras existentes: {e}")
+    
+    def _cancel_sample_loading(self):
+        """Cancela o carregamento em andamento das amostras do disco."""
+        if self._load_after_id is not None:
+            try:
+                self.after_cancel(self._load_after_id)
+            except Exception:
+                pass
+            self._load_after_id = None
+        for future, *_ in self._pending_loads:
+            future.cancel()
+        self._pending_loads = []
+    
+    def _install_loaded_samples(self, pending):
+        """Instala, na ordem dos arquivos, as amostras já decodificadas e reagenda o restante."""
         try:
-            # Verifica se o diretório de amostras foi definido
-            if not self.samples_dir:
-                print("Diretório de amostras não definido. Pulando carregamento de amostras existentes.")
+            self._load_after_id = None
+            # Carregamento cancelado (histórico limpo) ou diálogo fechado
+            if pending is not self._pending_loads or not self.winfo_exists():
                 return
-                
-            # Verifica se existem amostras OK
-            ok_samples_dir = os.path.join(self.samples_dir, "ok")
-            if os.path.exists(ok_samples_dir):
-                for filename in sorted(os.listdir(ok_samples_dir)):
-                    if filename.lower().endswith(('.png', '.jpg', '.jpeg')):
-                        sample_path = os.path.join(ok_samples_dir, filename)
-                        try:
-                            # Carrega a imagem
-                            roi_image = cv2.imread(sample_path)
-                            if roi_image is not None:
-                                # Extrai timestamp do nome do arquivo
-                                timestamp_str = filename.split('_')[2:4]  # ok_sample_YYYYMMDD_HHMMSS
-                                if len(timestamp_str) >= 2:
-                                    date_part = timestamp_str[0]
-                                    time_part = timestamp_str[1].split('.')[0]  # Remove extensão
-                                    timestamp = datetime.strptime(f"{date_part}_{time_part}", "%Y%m%d_%H%M%S")
-                                else:
-                                    timestamp = datetime.now()
-                                
-                                # Adiciona à lista de amostras
-                                self.training_samples.append({
-                                    'roi': roi_image,
-                                    'label': 'OK',
-                                    'timestamp': timestamp
-                                })
-                                
-                                # Adiciona ao histórico visual
-                                self.add_sample_to_history(roi_image, "OK", timestamp)
-                        except Exception as e:
-                            print(f"Erro ao carregar amostra OK {filename}: {e}")
-            
-            # Verifica se existem amostras NG
-            ng_samples_dir = os.path.join(self.samples_dir, "ng")
-            if os.path.exists(ng_samples_dir):
-                for filename in sorted(os.listdir(ng_samples_dir)):
-                    if filename.lower().endswith(('.png', '.jpg', '.jpeg')):
-                        sample_path = os.path.join(ng_samples_dir, filename)
-                        try:
-                            # Carrega a imagem
-                            roi_image = cv2.imread(sample_path)
-                            if roi_image is not None:
-                                # Extrai timestamp do nome do arquivo
-                                timestamp_str = filename.split('_')[2:4]  # ng_sample_YYYYMMDD_HHMMSS
-                                if len(timestamp_str) >= 2:
-                                    date_part = timestamp_str[0]
-                                    time_part = timestamp_str[1].split('.')[0]  # Remove extensão
-                                    timestamp = datetime.strptime(f"{date_part}_{time_part}", "%Y%m%d_%H%M%S")
-                                else:
-                                    timestamp = datetime.now()
-                                
-                                # Adiciona à lista de amostras
-                                self.training_samples.append({
-                                    'roi': roi_image,
-                                    'label': 'NG',
-                                    'timestamp': timestamp
-                                })
-                                
-                                # Adiciona ao histórico visual
-                                self.add_sample_to_history(roi_image, "NG", timestamp)
-                        except Exception as e:
-                            print(f"Erro ao carregar amostra NG {filename}: {e}")
+            
+            installed = 0
+            while pending and pending[0][0].done():
+                future, label, filename, sample_path = pending.pop(0)
+                try:
+                    loaded = future.result()
+                    if loaded is None:
+                        continue
+                    roi_image, roi_gray, thumb_rgb, timestamp = loaded
+                    
+                    # Adiciona à lista de amostras
+                    self._add_training_sample(roi_image, label, timestamp, roi_gray)
+                    
+                    # Adiciona ao histórico visual
+                    self.add_sample_to_history(roi_image, label, timestamp, sample_path, thumb_rgb)
+                    installed += 1
+                except Exception as e:
+                    print(f"Erro ao carregar amostra {label} {filename}: {e}")
             
             # Atualiza interface
-            self.update_info_label()
-            self.update_tab_titles()
+            if installed or not pending:
+                self.update_info_label()
+                self.update_tab_titles()
             
+            if pending:
+                self._load_after_id = self.after(15, self._install_loaded_samples, pending)
+                
         except Exception as e:
             print(f"Erro ao carregar amostras existentes: {e}")
     
     def update_info_label(self):
         """Atualiza o label de informações."""
-        ok_count = sum(1 for sample in self.training_samples if sample['label'] == 'OK')
-        ng_count = sum(1 for sample in self.training_samples if sample['label'] == 'NG')
+        self.info_label.config(
+            text=f"Amostras coletadas: {self._sample_counts['OK']} OK, {self._sample_counts['NG']} NG")
         
-        self.info_label.config(text=f"Amostras coletadas: {ok_count} OK, {ng_count} NG")
-        
-        # Habilita botão de aplicar se há amostras suficientes
-        if len(self.training_samples) >= 2:  # Pelo menos 2 amostras
+        # Habilita botão de aplicar se há amostras suficientes (pelo menos 2) e todas as
+        # amostras do disco já foram carregadas, para não treinar com um conjunto parcial
+        if len(self.training_samples) >= 2 and not self._pending_loads:
             self.btn_apply_training.config(state=NORMAL)
             # Habilita botões ML se método ML estiver selecionado
             if self.use_ml:
                 self.btn_train_ml.config(state=NORMAL)
+        else:
+            self.btn_apply_training.config(state=DISABLED)
+            self.btn_train_ml.config(state=DISABLED)
+    
+    def on_sample_format_change(self):
+        """Callback quando o formato das amostras (JPEG/PNG) é alterado."""
+        sample_format = 'png' if self.lossless_samples_var.get() else 'jpg'
+        self.sample_ext = '.' + sample_format
+        if self.slot_data.get('sample_format', 'jpg') != sample_format:
+            self.slot_data['sample_format'] = sample_format
+            self.montagem_instance.update_slot_data(self.slot_data)
+            self.montagem_instance.mark_model_modified()
     
     def on_method_change(self):
         """Callback quando o método de treinamento é alterado."""
@@ -2094,10 +3165,7 @@ class SlotTrainingDialog(Toplevel):
                 messagebox.showinfo("Informação", f"Treinando com {len(self.training_samples)} amostras.\nPara melhor precisão, recomenda-se 10+ amostras.")
             
             # Verifica se há amostras OK e NG
-            ok_samples = [s for s in self.training_samples if s['label'] == 'OK']
-            ng_samples = [s for s in self.training_samples if s['label'] == 'NG']
-            
-            if not ok_samples or not ng_samples:
+            if not self._sample_counts['OK'] or not self._sample_counts['NG']:
                 messagebox.showwarning("Aviso", "É necessário ter amostras tanto OK quanto NG para treinamento de ML.")
                 return
             
@@ -2115,15 +3183,47 @@ class SlotTrainingDialog(Toplevel):
             progress_bar.pack(pady=10, padx=20, fill=X)
             progress_bar.start()
             
-            # Força atualização da interface
-            progress_window.update()
+            # Treina em uma thread separada para a barra animar e a interface não travar;
+            # o resultado é recolhido no loop do Tk por _poll_ml_training
+            self.btn_train_ml.config(state=DISABLED)
+            samples = list(self.training_samples.values())
+            result = {}
+            
+            def _worker():
+                try:
+                    result['metrics'] = self.ml_classifier.train(samples)
+                except Exception as e:
+                    result['error'] = e
             
-            # Treina o modelo
-            metrics = self.ml_classifier.train(self.training_samples)
+            worker = threading.Thread(target=_worker, name="ml-training", daemon=True)
+            worker.start()
+            self.after(100, self._poll_ml_training, worker, result, progress_window, progress_bar)
             
+        except Exception as e:
+            self.btn_train_ml.config(state=NORMAL)
+            messagebox.showerror("Erro", f"Erro ao treinar modelo ML: {str(e)}")
+    
+    def _poll_ml_training(self, worker, result, progress_window, progress_bar):
+        """Aguarda o fim do treinamento ML sem bloquear a interface."""
+        if worker.is_alive():
+            self.after(100, self._poll_ml_training, worker, result, progress_window, progress_bar)
+            return
+        
+        try:
             # Para a barra de progresso
             progress_bar.stop()
             progress_window.destroy()
+        except Exception:
+            pass
+        
+        try:
+            if not self.winfo_exists():
+                return
+            self.btn_train_ml.config(state=NORMAL)
+            
+            if 'error' in result:
+                raise result['error']
+            metrics = result['metrics']
             
             # Mostra resultados
             accuracy = metrics.get('accuracy', 0)
@@ -2201,10 +3301,13 @@ class SlotTrainingDialog(Toplevel):
             if len(self.training_samples) < 2:
                 messagebox.showwarning("Aviso", "São necessárias pelo menos 2 amostras para treinamento.")
                 return
+            if self._pending_loads:
+                messagebox.showwarning("Aviso", "Aguarde o carregamento das amostras existentes.")
+                return
                 
-            # Analisa as amostras para ajustar parâmetros
-            ok_samples = [s['roi'] for s in self.training_samples if s['label'] == 'OK']
-            ng_samples = [s['roi'] for s in self.training_samples if s['label'] == 'NG']
+            # Analisa as amostras para ajustar parâmetros (limiar e template usam só a versão em cinza)
+            ok_samples = [s['roi_gray'] for s in self.training_samples.values() if s['label'] == 'OK']
+            ng_samples = [s['roi_gray'] for s in self.training_samples.values() if s['label'] == 'NG']
             
             if not ok_samples:
                 messagebox.showwarning("Aviso", "É necessária pelo menos uma amostra OK.")
@@ -2216,18 +3319,11 @@ class SlotTrainingDialog(Toplevel):
                     messagebox.showwarning("Aviso", "Modelo ML não foi treinado ainda. Treine o modelo primeiro.")
                     return
                 
-                # Testa o modelo com as amostras atuais
-                correct_predictions = 0
-                total_predictions = 0
-                
-                for sample in self.training_samples:
-                    prediction = self.ml_classifier.predict(sample['roi'])
-                    expected = 1 if sample['label'] == 'OK' else 0
-                    if prediction == expected:
-                        correct_predictions += 1
-                    total_predictions += 1
-                
-                accuracy = correct_predictions / total_predictions if total_predictions > 0 else 0
+                # Testa o modelo com as amostras atuais (uma única predição em lote)
+                samples = list(self.training_samples.values())
+                predictions = self.ml_classifier.predict_batch([sample['roi'] for sample in samples])
+                expected = np.array([1 if sample['label'] == 'OK' else 0 for sample in samples])
+                accuracy = float((predictions == expected).mean()) if samples else 0
                 
                 # Atualiza configurações do slot para usar ML
                 self.slot_data['use_ml'] = True
@@ -2252,11 +3348,12 @@ class SlotTrainingDialog(Toplevel):
                 )
                 
                 messagebox.showinfo("Sucesso", result_msg)
+                wait_pending_sample_saves()
                 self.destroy()
                 
             else:
                 # Modo tradicional (threshold)
-                new_threshold = self.calculate_optimal_threshold(ok_samples, ng_samples)
+                new_threshold, ok_correlations = self.calculate_optimal_threshold(ok_samples, ng_samples)
                 
                 if new_threshold is not None:
                     # Atualiza o slot com o novo limiar
@@ -2266,7 +3363,7 @@ class SlotTrainingDialog(Toplevel):
                     
                     # Salva um template melhorado se há amostras OK
                     if ok_samples:
-                        self.update_template_with_best_sample(ok_samples)
+                        self.update_template_with_best_sample(ok_samples, ok_correlations)
                     
                     # Atualiza o slot na instância principal
                     self.montagem_instance.update_slot_data(self.slot_data)
@@ -2280,6 +3377,7 @@ class SlotTrainingDialog(Toplevel):
                         f"Novo limiar: {new_threshold:.3f}\n\n"
                         f"Amostras utilizadas: {len(self.training_samples)}")
                     
+                    wait_pending_sample_saves()
                     self.destroy()
                 else:
                     messagebox.showerror("Erro", "Não foi possível calcular novo limiar.")
@@ -2288,30 +3386,37 @@ class SlotTrainingDialog(Toplevel):
             messagebox.showerror("Erro", f"Erro ao aplicar treinamento: {str(e)}")
             
     def calculate_optimal_threshold(self, ok_samples, ng_samples):
-        """Calcula o limiar ótimo baseado nas amostras de treinamento."""
+        """
+        Calcula o limiar ótimo baseado nas amostras de treinamento (ROIs em escala de cinza).
+        Retorna (limiar, correlações OK por amostra) ou (None, None). As correlações só são
+        devolvidas quando o template veio do disco, para reaproveitamento em
+        update_template_with_best_sample.
+        """
         try:
             # Validações iniciais
             if not ok_samples:
                 print("Erro: Nenhuma amostra OK fornecida")
-                return None
+                return None, None
                 
             # Carrega template atual ou cria um temporário
             template_path = self.slot_data.get('template_path')
             template = None
             
-            if template_path and Path(template_path).exists():
-                template = cv2.imread(template_path, cv2.IMREAD_GRAYSCALE)
+            # Mesmo cache (por mtime) da inspeção: retreinos não decodificam o PNG de novo
+            template_mtime = _template_mtime(template_path)
+            if template_mtime is not None:
+                template = _read_template_gray(str(template_path), template_mtime)
                 print(f"Template carregado de: {template_path}")
+            template_from_disk = template is not None
             
             # Se não há template ou falhou ao carregar, usa a primeira amostra OK como template
             if template is None:
                 if not ok_samples:
                     print("Erro: Não há template nem amostras OK para usar como referência")
-                    return None
+                    return None, None
                     
                 print("Template não encontrado. Usando primeira amostra OK como referência.")
-                first_sample = ok_samples[0]
-                template = cv2.cvtColor(first_sample, cv2.COLOR_BGR2GRAY)
+                template = ok_samples[0]
                 
                 # Salva template temporário se possível
                 if template_path:
@@ -2323,91 +3428,30 @@ class SlotTrainingDialog(Toplevel):
                     except Exception as e:
                         print(f"Aviso: Não foi possível salvar template temporário: {e}")
                 
-            # Calcula correlações para amostras OK
-            ok_correlations = []
-            for i, roi in enumerate(ok_samples):
-                try:
-                    if roi is None or roi.size == 0:
-                        print(f"Aviso: Amostra OK {i} é inválida")
-                        continue
-                        
-                    roi_gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
-                    
-                    if roi_gray.size == 0:
-                        print(f"Aviso: Amostra OK {i} resultou em imagem vazia")
-                        continue
-                    
-                    # Redimensiona template se necessário
-                    if roi_gray.shape != template.shape:
-                        template_resized = cv2.resize(template, (roi_gray.shape[1], roi_gray.shape[0]))
-                    else:
-                        template_resized = template
-                        
-                    # Template matching
-                    result = cv2.matchTemplate(roi_gray, template_resized, cv2.TM_CCOEFF_NORMED)
-                    _, max_val, _, _ = cv2.minMaxLoc(result)
-                    
-                    # Valida o resultado
-                    if not np.isnan(max_val) and not np.isinf(max_val):
-                        ok_correlations.append(max_val)
-                    else:
-                        print(f"Aviso: Correlação inválida para amostra OK {i}: {max_val}")
-                        
-                except Exception as e:
-                    print(f"Erro ao processar amostra OK {i}: {e}")
-                    continue
-                
-            # Calcula correlações para amostras NG (se existirem)
-            ng_correlations = []
-            for i, roi in enumerate(ng_samples):
-                try:
-                    if roi is None or roi.size == 0:
-                        print(f"Aviso: Amostra NG {i} é inválida")
-                        continue
-                        
-                    roi_gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
-                    
-                    if roi_gray.size == 0:
-                        print(f"Aviso: Amostra NG {i} resultou em imagem vazia")
-                        continue
-                    
-                    if roi_gray.shape != template.shape:
-                        template_resized = cv2.resize(template, (roi_gray.shape[1], roi_gray.shape[0]))
-                    else:
-                        template_resized = template
-                        
-                    result = cv2.matchTemplate(roi_gray, template_resized, cv2.TM_CCOEFF_NORMED)
-                    _, max_val, _, _ = cv2.minMaxLoc(result)
-                    
-                    # Valida o resultado
-                    if not np.isnan(max_val) and not np.isinf(max_val):
-                        ng_correlations.append(max_val)
-                    else:
-                        print(f"Aviso: Correlação inválida para amostra NG {i}: {max_val}")
-                        
-                except Exception as e:
-                    print(f"Erro ao processar amostra NG {i}: {e}")
-                    continue
+            # Template redimensionado por forma de ROI (as amostras costumam ter poucas formas)
+            resized_templates = {template.shape: template}
+            
+            # Calcula correlações para amostras OK e NG (se existirem)
+            ok_by_sample = self._template_correlations(ok_samples, "OK", template, resized_templates)
+            ng_by_sample = self._template_correlations(ng_samples, "NG", template, resized_templates)
+            ok_arr = ok_by_sample[np.isfinite(ok_by_sample)]
+            ng_arr = ng_by_sample[np.isfinite(ng_by_sample)]
                 
             # Verifica se temos correlações válidas
-            if not ok_correlations:
+            if not ok_arr.size:
                 print("Erro: Nenhuma correlação válida foi calculada para amostras OK")
-                return None
+                return None, None
                 
-            print(f"Correlações OK calculadas: {len(ok_correlations)} amostras")
-            print(f"Correlações NG calculadas: {len(ng_correlations)} amostras")
+            print(f"Correlações OK calculadas: {ok_arr.size} amostras")
+            print(f"Correlações NG calculadas: {ng_arr.size} amostras")
             
-            # Calcula limiar ótimo
-            min_ok = min(ok_correlations)
-            max_ok = max(ok_correlations)
-            avg_ok = sum(ok_correlations) / len(ok_correlations)
+            # Calcula limiar ótimo (reduções vetorizadas em float64)
+            min_ok, max_ok, avg_ok = float(ok_arr.min()), float(ok_arr.max()), float(ok_arr.mean())
             
             print(f"Estatísticas OK - Min: {min_ok:.3f}, Max: {max_ok:.3f}, Média: {avg_ok:.3f}")
             
-            if ng_correlations:
-                min_ng = min(ng_correlations)
-                max_ng = max(ng_correlations)
-                avg_ng = sum(ng_correlations) / len(ng_correlations)
+            if ng_arr.size:
+                min_ng, max_ng, avg_ng = float(ng_arr.min()), float(ng_arr.max()), float(ng_arr.mean())
                 
                 print(f"Estatísticas NG - Min: {min_ng:.3f}, Max: {max_ng:.3f}, Média: {avg_ng:.3f}")
                 
@@ -2430,57 +3474,93 @@ class SlotTrainingDialog(Toplevel):
                 print(f"Apenas amostras OK. Limiar conservador: {new_threshold:.3f}")
                 
             # Validação final
-            if np.isnan(new_threshold) or np.isinf(new_threshold):
+            if not np.isfinite(new_threshold):
                 print(f"Erro: Limiar calculado é inválido: {new_threshold}")
-                return None
+                return None, None
                 
             print(f"Limiar final calculado: {new_threshold:.3f}")
-            return new_threshold
-                
-            return None
+            return new_threshold, (ok_by_sample if template_from_disk else None)
             
         except Exception as e:
             print(f"Erro ao calcular limiar: {e}")
-            return None
-            
-    def update_template_with_best_sample(self, ok_samples):
-        """Atualiza o template com a melhor amostra OK."""
+            return None, None
+            
+    def _template_correlations(self, samples, label, template, resized_templates):
+        """
+        Correlação (TM_CCOEFF_NORMED) de cada ROI em cinza com o template redimensionado
+        para a sua forma. ROIs da mesma forma são avaliadas juntas por _ncc_batch.
+        Retorna um array float64 alinhado com samples, com NaN nas amostras inválidas.
+        """
+        groups = {}
+        for i, roi in enumerate(samples):
+            if roi is None or roi.size == 0:
+                print(f"Aviso: Amostra {label} {i} é inválida")
+                continue
+            groups.setdefault(roi.shape, []).append(i)
+        
+        correlations = np.full(len(samples), np.nan)
+        for shape, indices in groups.items():
+            try:
+                # Redimensiona template se necessário
+                template_resized = resized_templates.get(shape)
+                if template_resized is None:
+                    template_resized = cv2.resize(template, (shape[1], shape[0]))
+                    resized_templates[shape] = template_resized
+                
+                values = _ncc_batch(template_resized, [samples[i] for i in indices])
+                
+                # Valida o resultado
+                valid = np.isfinite(values)
+                if not valid.all():
+                    print(f"Aviso: {int((~valid).sum())} correlações inválidas em amostras {label}")
+                correlations[indices] = values
+            except Exception as e:
+                print(f"Erro ao processar amostras {label} {shape[1]}x{shape[0]}: {e}")
+        return correlations
+    
+    def update_template_with_best_sample(self, ok_samples, ok_correlations=None):
+        """
+        Atualiza o template com a melhor amostra OK (ROIs em escala de cinza).
+        ok_correlations (de calculate_optimal_threshold) evita recalcular as correlações
+        quando todas as amostras já têm a forma do template.
+        """
         try:
             template_path = self.slot_data.get('template_path')
             if not template_path:
                 return
                 
             # Encontra a melhor amostra (maior correlação com template atual)
-            current_template = cv2.imread(template_path, cv2.IMREAD_GRAYSCALE)
+            template_mtime = _template_mtime(template_path)
+            if template_mtime is None:
+                return
+            current_template = _read_template_gray(str(template_path), template_mtime)
             if current_template is None:
                 return
                 
-            best_sample = None
-            best_correlation = -1
+            # Redimensiona para comparar (todas passam a ter a forma do template)
+            template_size = (current_template.shape[1], current_template.shape[0])
+            resized_samples = [roi_gray if roi_gray.shape == current_template.shape
+                               else cv2.resize(roi_gray, template_size)
+                               for roi_gray in ok_samples]
             
-            for roi in ok_samples:
-                roi_gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
-                
-                # Redimensiona para comparar
-                if roi_gray.shape != current_template.shape:
-                    roi_resized = cv2.resize(roi_gray, (current_template.shape[1], current_template.shape[0]))
-                else:
-                    roi_resized = roi_gray
-                    
-                # Calcula correlação
-                result = cv2.matchTemplate(roi_resized, current_template, cv2.TM_CCOEFF_NORMED)
-                _, max_val, _, _ = cv2.minMaxLoc(result)
-                
-                if max_val > best_correlation:
-                    best_correlation = max_val
-                    best_sample = roi_gray
-                    
-            # Salva o melhor template
-            if best_sample is not None:
-                # Redimensiona para o tamanho original do template
-                if best_sample.shape != current_template.shape:
-                    best_sample = cv2.resize(best_sample, (current_template.shape[1], current_template.shape[0]))
-                    
+            # Calcula correlações de uma vez (mesma forma: resultado 1x1 do matchTemplate),
+            # ou reaproveita as do cálculo do limiar, que são as mesmas sem redimensionamento
+            if not resized_samples:
+                return
+            if (ok_correlations is not None and len(ok_correlations) == len(ok_samples)
+                    and np.isfinite(ok_correlations).any()
+                    and all(roi_gray.shape == current_template.shape for roi_gray in ok_samples)):
+                correlations = np.where(np.isfinite(ok_correlations), ok_correlations, -np.inf)
+            else:
+                correlations = _ncc_batch(current_template, resized_samples)
+            
+            # Melhor amostra direto pelo argmax do vetor de correlações
+            best_index = int(np.argmax(correlations))
+            best_correlation = float(correlations[best_index])
+            best_sample = resized_samples[best_index]
+            
+            # Salva o melhor template (já no tamanho original do template)
+            if np.isfinite(best_correlation):
                 cv2.imwrite(template_path, best_sample)
                 print(f"Template atualizado com melhor amostra (correlação: {best_correlation:.3f})")
                 
@@ -2489,9 +3569,25 @@ class SlotTrainingDialog(Toplevel):
             
     def cancel(self):
         """Cancela o treinamento."""
+        # Amostras ainda na fila de gravação não podem se perder ao fechar
+        wait_pending_sample_saves()
         self.destroy()
 
 
+# Formatadores dos labels dos sliders (métodos __mod__ já ligados, sem f-string por tick)
+_FMT_INT = "%d".__mod__
+_FMT_2F = "%.2f".__mod__
+_FMT_PCT = "%d%%".__mod__
+
+# Cores editáveis no diálogo de configurações: (rótulo, chave em style_config["colors"], título do seletor)
+CONFIG_COLOR_FIELDS = (
+    ("Cor de Fundo:", "background_color", "Escolher Cor de Fundo"),
+    ("Cor do Texto:", "text_color", "Escolher Cor do Texto"),
+    ("Cor OK:", "ok_color", "Escolher Cor OK"),
+    ("Cor NG:", "ng_color", "Escolher Cor NG"),
+)
+
+
 class SystemConfigDialog(Toplevel):
     def __init__(self, parent):
         super().__init__(parent)
@@ -2508,6 +3604,10 @@ class SystemConfigDialog(Toplevel):
         self.style_config = load_style_config()
         
         self.result = False
+        
+        # Valores pendentes dos labels dos sliders, aplicados uma vez por ciclo ocioso
+        self._pending_labels = {}
+        
         self.center_window()
         self.setup_ui()
     
@@ -2520,42 +3620,106 @@ class SystemConfigDialog(Toplevel):
         self.geometry(f"{width}x{height}+{x}+{y}")
     
     def setup_ui(self):
-        # Criar um canvas com scrollbar para acomodar todas as configurações
-        container = ttk.Frame(self)
-        container.pack(fill=BOTH, expand=True, padx=10, pady=10)
-        
-        # Criar canvas com tamanho adequado
-        canvas = Canvas(container, width=530, height=700)
-        scrollbar = ttk.Scrollbar(container, orient="vertical", command=canvas.yview)
-        scrollable_frame = ttk.Frame(canvas, width=520)
-        
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
+        # Variáveis de todas as abas são criadas já aqui (baratas, sem widgets), para que
+        # save_config e restore_defaults funcionem mesmo com abas ainda não construídas
+        self.create_variables()
+        
+        # Botões fixos na parte inferior - usando um frame com espaçamento melhor
+        button_frame = ttk.Frame(self)
+        button_frame.pack(side=BOTTOM, fill=X, pady=(10, 10), padx=10)
+        
+        # Distribuir os botões uniformemente
+        save_btn = ttk.Button(button_frame, text="Salvar", command=self.save_config)
+        save_btn.pack(side=LEFT, padx=5, pady=5, expand=True, fill=X)
+        
+        restore_btn = ttk.Button(button_frame, text="Restaurar Padrões", command=self.restore_defaults)
+        restore_btn.pack(side=LEFT, padx=5, pady=5, expand=True, fill=X)
+        
+        cancel_btn = ttk.Button(button_frame, text="Cancelar", command=self.cancel)
+        cancel_btn.pack(side=LEFT, padx=5, pady=5, expand=True, fill=X)
+        
+        # Notebook com uma aba por grupo; os widgets de cada aba só são criados
+        # na primeira vez em que ela é selecionada
+        self.notebook = ttk.Notebook(self)
+        self.notebook.pack(fill=BOTH, expand=True, padx=10, pady=(10, 0))
+        
+        self._tab_builders = {}
+        for title, builder in (("ORB", self._build_orb_tab),
+                               ("Detecção", self._build_detection_tab),
+                               ("Aparência", self._build_appearance_tab),
+                               ("HUD", self._build_hud_tab)):
+            tab = ttk.Frame(self.notebook)
+            self.notebook.add(tab, text=title)
+            self._tab_builders[str(tab)] = (tab, builder)
+        
+        self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+        self._on_tab_changed()
+    
+    def create_variables(self):
+        """Cria as variáveis Tk de todas as configurações a partir dos valores atuais."""
+        # Configurações ORB
+        self.orb_features_var = ttk.IntVar(value=ORB_FEATURES)
+        self.scale_factor_var = ttk.DoubleVar(value=ORB_SCALE_FACTOR)
+        self.n_levels_var = ttk.IntVar(value=ORB_N_LEVELS)
         
-        # Adicionar evento de rolagem com o mouse
-        def _on_mousewheel(event):
-            canvas.yview_scroll(int(-1*(event.delta/120)), "units")
-        canvas.bind_all("<MouseWheel>", _on_mousewheel)
+        # Configurações de Canvas
+        self.preview_w_var = ttk.IntVar(value=PREVIEW_W)
+        self.preview_h_var = ttk.IntVar(value=PREVIEW_H)
         
-        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
+        # Configurações Padrão de Detecção
+        self.thr_corr_var = ttk.DoubleVar(value=THR_CORR)
+        self.min_px_var = ttk.IntVar(value=MIN_PX)
         
-        # Configurar o layout
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+        # Fontes
+        self.slot_font_size_var = ttk.IntVar(value=int(self.style_config.get("slot_font_size", 10)))
+        self.result_font_size_var = ttk.IntVar(value=int(self.style_config.get("result_font_size", 10)))
+        self.button_font_size_var = ttk.IntVar(value=int(self.style_config.get("button_font_size", 9)))
         
-        # Frame principal dentro do scrollable_frame
-        main_frame = ttk.Frame(scrollable_frame)
-        main_frame.pack(fill=BOTH, expand=True)
+        # HUD e Inspeção
+        self.hud_font_size_var = ttk.IntVar(value=int(self.style_config.get("hud_font_size", 12)))
+        self.hud_opacity_var = ttk.IntVar(value=int(self.style_config.get("hud_opacity", 80)))
+        self.hud_position_var = ttk.StringVar(value=self.style_config.get("hud_position", "top-right"))
+        self.show_fps_var = ttk.BooleanVar(value=self.style_config.get("show_fps", True))
+        self.show_timestamp_var = ttk.BooleanVar(value=self.style_config.get("show_timestamp", True))
         
+        # Cores (chave em style_config["colors"] -> variável)
+        self.color_vars = {
+            key: ttk.StringVar(value=get_color(f'colors.{key}', self.style_config))
+            for _, key, _ in CONFIG_COLOR_FIELDS
+        }
+    
+    def _schedule_label(self, label, fmt, value):
+        """
+        Agenda a atualização do texto de um label de slider para o próximo ciclo
+        ocioso; durante um arraste só o último valor chega a ser aplicado.
+        fmt é um dos formatadores _FMT_* e value o valor bruto (texto) do Scale.
+        """
+        if label not in self._pending_labels:
+            self.after_idle(self._flush_label, label)
+        self._pending_labels[label] = (fmt, value)
+    
+    def _flush_label(self, label):
+        """Aplica o último valor pendente de um label de slider."""
+        fmt, value = self._pending_labels.pop(label, (None, None))
+        if fmt is not None:
+            try:
+                label.config(text=fmt(float(value)))
+            except Exception as e:
+                print(f"Erro ao atualizar label: {e}")
+    
+    def _on_tab_changed(self, event=None):
+        """Constrói os widgets da aba selecionada na primeira vez em que ela é exibida."""
+        tab, builder = self._tab_builders.get(self.notebook.select(), (None, None))
+        if tab is not None and not getattr(tab, '_built', False):
+            tab._built = True
+            builder(tab)
+    
+    def _build_orb_tab(self, parent):
         # Configurações ORB
-        orb_frame = ttk.LabelFrame(main_frame, text="Configurações ORB (Alinhamento de Imagem)")
-        orb_frame.pack(fill=X, pady=(0, 10))
+        orb_frame = ttk.LabelFrame(parent, text="Configurações ORB (Alinhamento de Imagem)")
+        orb_frame.pack(fill=X, pady=(10, 10), padx=5)
         
         ttk.Label(orb_frame, text="Número de Features:").pack(anchor="w", padx=5, pady=2)
-        self.orb_features_var = ttk.IntVar(value=ORB_FEATURES)
         features_frame = ttk.Frame(orb_frame)
         features_frame.pack(fill=X, padx=5, pady=5)
         
@@ -2566,11 +3730,10 @@ class SystemConfigDialog(Toplevel):
         self.features_label.pack(side=RIGHT, padx=(5, 0))
         
         def update_features_label(val):
-            self.features_label.config(text=f"{int(float(val))}")
+            self._schedule_label(self.features_label, _FMT_INT, val)
         self.features_scale.config(command=update_features_label)
         
         ttk.Label(orb_frame, text="Fator de Escala:").pack(anchor="w", padx=5, pady=(10, 2))
-        self.scale_factor_var = ttk.DoubleVar(value=ORB_SCALE_FACTOR)
         scale_frame = ttk.Frame(orb_frame)
         scale_frame.pack(fill=X, padx=5, pady=5)
         
@@ -2581,34 +3744,19 @@ class SystemConfigDialog(Toplevel):
         self.scale_label.pack(side=RIGHT, padx=(5, 0))
         
         def update_scale_label(val):
-            self.scale_label.config(text=f"{float(val):.2f}")
+            self._schedule_label(self.scale_label, _FMT_2F, val)
         self.scale_scale.config(command=update_scale_label)
         
         ttk.Label(orb_frame, text="Número de Níveis:").pack(anchor="w", padx=5, pady=(10, 2))
-        self.n_levels_var = ttk.IntVar(value=ORB_N_LEVELS)
         levels_spin = ttk.Spinbox(orb_frame, from_=4, to=16, textvariable=self.n_levels_var, width=10)
         levels_spin.pack(anchor="w", padx=5, pady=5)
-        
-        # Configurações de Canvas
-        canvas_frame = ttk.LabelFrame(main_frame, text="Configurações de Visualização")
-        canvas_frame.pack(fill=X, pady=(0, 10))
-        
-        ttk.Label(canvas_frame, text="Largura Máxima do Preview:").pack(anchor="w", padx=5, pady=2)
-        self.preview_w_var = ttk.IntVar(value=PREVIEW_W)
-        w_spin = ttk.Spinbox(canvas_frame, from_=400, to=1600, increment=100, textvariable=self.preview_w_var, width=10)
-        w_spin.pack(anchor="w", padx=5, pady=5)
-        
-        ttk.Label(canvas_frame, text="Altura Máxima do Preview:").pack(anchor="w", padx=5, pady=(10, 2))
-        self.preview_h_var = ttk.IntVar(value=PREVIEW_H)
-        h_spin = ttk.Spinbox(canvas_frame, from_=300, to=1200, increment=100, textvariable=self.preview_h_var, width=10)
-        h_spin.pack(anchor="w", padx=5, pady=5)
-        
+    
+    def _build_detection_tab(self, parent):
         # Configurações Padrão de Detecção
-        detection_frame = ttk.LabelFrame(main_frame, text="Configurações Padrão de Detecção")
-        detection_frame.pack(fill=X, pady=(0, 10))
+        detection_frame = ttk.LabelFrame(parent, text="Configurações Padrão de Detecção")
+        detection_frame.pack(fill=X, pady=(10, 10), padx=5)
         
         ttk.Label(detection_frame, text="Limiar de Correlação Padrão (Clips):").pack(anchor="w", padx=5, pady=2)
-        self.thr_corr_var = ttk.DoubleVar(value=THR_CORR)
         corr_frame = ttk.Frame(detection_frame)
         corr_frame.pack(fill=X, padx=5, pady=5)
         
@@ -2619,17 +3767,29 @@ class SystemConfigDialog(Toplevel):
         self.corr_label.pack(side=RIGHT, padx=(5, 0))
         
         def update_corr_label(val):
-            self.corr_label.config(text=f"{float(val):.2f}")
+            self._schedule_label(self.corr_label, _FMT_2F, val)
         self.corr_scale.config(command=update_corr_label)
         
         ttk.Label(detection_frame, text="Pixels Mínimos Padrão (Template Matching):").pack(anchor="w", padx=5, pady=(10, 2))
-        self.min_px_var = ttk.IntVar(value=MIN_PX)
         px_spin = ttk.Spinbox(detection_frame, from_=1, to=1000, textvariable=self.min_px_var, width=10)
         px_spin.pack(anchor="w", padx=5, pady=5)
+    
+    def _build_appearance_tab(self, parent):
+        # Configurações de Canvas
+        canvas_frame = ttk.LabelFrame(parent, text="Configurações de Visualização")
+        canvas_frame.pack(fill=X, pady=(10, 10), padx=5)
+        
+        ttk.Label(canvas_frame, text="Largura Máxima do Preview:").pack(anchor="w", padx=5, pady=2)
+        w_spin = ttk.Spinbox(canvas_frame, from_=400, to=1600, increment=100, textvariable=self.preview_w_var, width=10)
+        w_spin.pack(anchor="w", padx=5, pady=5)
+        
+        ttk.Label(canvas_frame, text="Altura Máxima do Preview:").pack(anchor="w", padx=5, pady=(10, 2))
+        h_spin = ttk.Spinbox(canvas_frame, from_=300, to=1200, increment=100, textvariable=self.preview_h_var, width=10)
+        h_spin.pack(anchor="w", padx=5, pady=5)
         
         # Configurações de Aparência por Local
-        appearance_frame = ttk.LabelFrame(main_frame, text="Configurações de Aparência por Local")
-        appearance_frame.pack(fill=X, pady=(0, 10))
+        appearance_frame = ttk.LabelFrame(parent, text="Configurações de Aparência por Local")
+        appearance_frame.pack(fill=X, pady=(0, 10), padx=5)
         
         # Configurações de Fonte para Diferentes Locais
         font_frame = ttk.Frame(appearance_frame)
@@ -2637,25 +3797,44 @@ class SystemConfigDialog(Toplevel):
         
         # Fonte para Slots
         ttk.Label(font_frame, text="Tamanho da Fonte para Slots:").pack(anchor="w", padx=5, pady=(10, 2))
-        self.slot_font_size_var = ttk.IntVar(value=int(self.style_config.get("slot_font_size", 10)))
         slot_font_spin = ttk.Spinbox(font_frame, from_=8, to=24, textvariable=self.slot_font_size_var, width=10)
         slot_font_spin.pack(anchor="w", padx=5, pady=5)
         
         # Fonte para Resultados
         ttk.Label(font_frame, text="Tamanho da Fonte para Resultados:").pack(anchor="w", padx=5, pady=(10, 2))
-        self.result_font_size_var = ttk.IntVar(value=int(self.style_config.get("result_font_size", 10)))
         result_font_spin = ttk.Spinbox(font_frame, from_=8, to=24, textvariable=self.result_font_size_var, width=10)
         result_font_spin.pack(anchor="w", padx=5, pady=5)
         
         # Fonte para Botões
         ttk.Label(font_frame, text="Tamanho da Fonte para Botões:").pack(anchor="w", padx=5, pady=(10, 2))
-        self.button_font_size_var = ttk.IntVar(value=int(self.style_config.get("button_font_size", 9)))
         button_font_spin = ttk.Spinbox(font_frame, from_=8, to=20, textvariable=self.button_font_size_var, width=10)
         button_font_spin.pack(anchor="w", padx=5, pady=5)
         
+        # Cores
+        colors_frame = ttk.Frame(appearance_frame)
+        colors_frame.pack(fill=X, padx=5, pady=5)
+        
+        # Uma linha (rótulo, campo e botão do seletor) por cor
+        def make_chooser(var, title):
+            def choose_color():
+                color = colorchooser.askcolor(initialcolor=var.get(), title=title)
+                if color and color[1]:
+                    var.set(color[1])
+            return choose_color
+        
+        for text, key, title in CONFIG_COLOR_FIELDS:
+            var = self.color_vars[key]
+            color_frame = ttk.Frame(colors_frame)
+            color_frame.pack(fill=X, pady=2)
+            
+            ttk.Label(color_frame, text=text).pack(side=LEFT, padx=5)
+            ttk.Entry(color_frame, textvariable=var, width=10).pack(side=LEFT, padx=5)
+            ttk.Button(color_frame, text="Escolher", command=make_chooser(var, title)).pack(side=LEFT, padx=5)
+    
+    def _build_hud_tab(self, parent):
         # Configurações de HUD e Inspeção
-        hud_frame = ttk.LabelFrame(main_frame, text="Configurações de HUD e Inspeção")
-        hud_frame.pack(fill=X, pady=(0, 10))
+        hud_frame = ttk.LabelFrame(parent, text="Configurações de HUD e Inspeção")
+        hud_frame.pack(fill=X, pady=(10, 10), padx=5)
         
         # Configurações de HUD
         hud_config_frame = ttk.Frame(hud_frame)
@@ -2663,13 +3842,11 @@ class SystemConfigDialog(Toplevel):
         
         # Tamanho da Fonte do HUD
         ttk.Label(hud_config_frame, text="Tamanho da Fonte do HUD:").pack(anchor="w", padx=5, pady=(10, 2))
-        self.hud_font_size_var = ttk.IntVar(value=int(self.style_config.get("hud_font_size", 12)))
         hud_font_spin = ttk.Spinbox(hud_config_frame, from_=8, to=28, textvariable=self.hud_font_size_var, width=10)
         hud_font_spin.pack(anchor="w", padx=5, pady=5)
         
         # Opacidade do HUD
         ttk.Label(hud_config_frame, text="Opacidade do HUD (%):").pack(anchor="w", padx=5, pady=(10, 2))
-        self.hud_opacity_var = ttk.IntVar(value=int(self.style_config.get("hud_opacity", 80)))
         opacity_frame = ttk.Frame(hud_config_frame)
         opacity_frame.pack(fill=X, padx=5, pady=5)
         
@@ -2680,12 +3857,11 @@ class SystemConfigDialog(Toplevel):
         self.opacity_label.pack(side=RIGHT, padx=(5, 0))
         
         def update_opacity_label(val):
-            self.opacity_label.config(text=f"{int(float(val))}%")
+            self._schedule_label(self.opacity_label, _FMT_PCT, val)
         self.opacity_scale.config(command=update_opacity_label)
         
         # Posição do HUD
         ttk.Label(hud_config_frame, text="Posição do HUD:").pack(anchor="w", padx=5, pady=(10, 2))
-        self.hud_position_var = ttk.StringVar(value=self.style_config.get("hud_position", "top-right"))
         position_frame = ttk.Frame(hud_config_frame)
         position_frame.pack(fill=X, padx=5, pady=5)
         
@@ -2694,99 +3870,11 @@ class SystemConfigDialog(Toplevel):
         position_combo.pack(side=LEFT, padx=5)
         
         # Mostrar informações adicionais no HUD
-        self.show_fps_var = ttk.BooleanVar(value=self.style_config.get("show_fps", True))
         show_fps_check = ttk.Checkbutton(hud_config_frame, text="Mostrar FPS", variable=self.show_fps_var)
         show_fps_check.pack(anchor="w", padx=5, pady=5)
         
-        self.show_timestamp_var = ttk.BooleanVar(value=self.style_config.get("show_timestamp", True))
         show_timestamp_check = ttk.Checkbutton(hud_config_frame, text="Mostrar Timestamp", variable=self.show_timestamp_var)
         show_timestamp_check.pack(anchor="w", padx=5, pady=5)
-        
-        # Cores
-        colors_frame = ttk.Frame(appearance_frame)
-        colors_frame.pack(fill=X, padx=5, pady=5)
-        
-        # Cor de Fundo
-        bg_color_frame = ttk.Frame(colors_frame)
-        bg_color_frame.pack(fill=X, pady=2)
-        
-        ttk.Label(bg_color_frame, text="Cor de Fundo:").pack(side=LEFT, padx=5)
-        self.bg_color_var = ttk.StringVar(value=get_color('colors.background_color', self.style_config))
-        bg_color_entry = ttk.Entry(bg_color_frame, textvariable=self.bg_color_var, width=10)
-        bg_color_entry.pack(side=LEFT, padx=5)
-        
-        # Botão para escolher cor
-        def choose_bg_color():
-            color = colorchooser.askcolor(initialcolor=self.bg_color_var.get(), title="Escolher Cor de Fundo")
-            if color and color[1]:
-                self.bg_color_var.set(color[1])
-        
-        ttk.Button(bg_color_frame, text="Escolher", command=choose_bg_color).pack(side=LEFT, padx=5)
-        
-        # Cor do Texto
-        text_color_frame = ttk.Frame(colors_frame)
-        text_color_frame.pack(fill=X, pady=2)
-        
-        ttk.Label(text_color_frame, text="Cor do Texto:").pack(side=LEFT, padx=5)
-        self.text_color_var = ttk.StringVar(value=get_color('colors.text_color', self.style_config))
-        text_color_entry = ttk.Entry(text_color_frame, textvariable=self.text_color_var, width=10)
-        text_color_entry.pack(side=LEFT, padx=5)
-        
-        # Botão para escolher cor
-        def choose_text_color():
-            color = colorchooser.askcolor(initialcolor=self.text_color_var.get(), title="Escolher Cor do Texto")
-            if color and color[1]:
-                self.text_color_var.set(color[1])
-        
-        ttk.Button(text_color_frame, text="Escolher", command=choose_text_color).pack(side=LEFT, padx=5)
-        
-        # Cor OK
-        ok_color_frame = ttk.Frame(colors_frame)
-        ok_color_frame.pack(fill=X, pady=2)
-        
-        ttk.Label(ok_color_frame, text="Cor OK:").pack(side=LEFT, padx=5)
-        self.ok_color_var = ttk.StringVar(value=get_color('colors.ok_color', self.style_config))
-        ok_color_entry = ttk.Entry(ok_color_frame, textvariable=self.ok_color_var, width=10)
-        ok_color_entry.pack(side=LEFT, padx=5)
-        
-        # Botão para escolher cor
-        def choose_ok_color():
-            color = colorchooser.askcolor(initialcolor=self.ok_color_var.get(), title="Escolher Cor OK")
-            if color and color[1]:
-                self.ok_color_var.set(color[1])
-        
-        ttk.Button(ok_color_frame, text="Escolher", command=choose_ok_color).pack(side=LEFT, padx=5)
-        
-        # Cor NG
-        ng_color_frame = ttk.Frame(colors_frame)
-        ng_color_frame.pack(fill=X, pady=2)
-        
-        ttk.Label(ng_color_frame, text="Cor NG:").pack(side=LEFT, padx=5)
-        self.ng_color_var = ttk.StringVar(value=get_color('colors.ng_color', self.style_config))
-        ng_color_entry = ttk.Entry(ng_color_frame, textvariable=self.ng_color_var, width=10)
-        ng_color_entry.pack(side=LEFT, padx=5)
-        
-        # Botão para escolher cor
-        def choose_ng_color():
-            color = colorchooser.askcolor(initialcolor=self.ng_color_var.get(), title="Escolher Cor NG")
-            if color and color[1]:
-                self.ng_color_var.set(color[1])
-        
-        ttk.Button(ng_color_frame, text="Escolher", command=choose_ng_color).pack(side=LEFT, padx=5)
-        
-        # Botões - usando um frame com espaçamento melhor
-        button_frame = ttk.Frame(main_frame)
-        button_frame.pack(fill=X, pady=(20, 10), padx=10)
-        
-        # Distribuir os botões uniformemente
-        save_btn = ttk.Button(button_frame, text="Salvar", command=self.save_config)
-        save_btn.pack(side=LEFT, padx=5, pady=5, expand=True, fill=X)
-        
-        restore_btn = ttk.Button(button_frame, text="Restaurar Padrões", command=self.restore_defaults)
-        restore_btn.pack(side=LEFT, padx=5, pady=5, expand=True, fill=X)
-        
-        cancel_btn = ttk.Button(button_frame, text="Cancelar", command=self.cancel)
-        cancel_btn.pack(side=LEFT, padx=5, pady=5, expand=True, fill=X)
     
     def save_config(self):
         """Salva as configurações do sistema"""
@@ -2810,8 +3898,9 @@ class SystemConfigDialog(Toplevel):
                 print(f"Erro ao reinicializar ORB: {e}")
                 messagebox.showwarning("Aviso", "Erro ao reinicializar detector ORB. O alinhamento pode não funcionar.")
             
-            # Salvar configurações de estilo
-            style_config = load_style_config()  # Carrega config atual
+            # Salvar configurações de estilo (parte da config já carregada no diálogo,
+            # sem reler o arquivo)
+            style_config = copy.deepcopy(self.style_config)
             
             # Atualiza configurações de fonte
             style_config["slot_font_size"] = self.slot_font_size_var.get()
@@ -2822,10 +3911,8 @@ class SystemConfigDialog(Toplevel):
             if "colors" not in style_config:
                 style_config["colors"] = {}
             
-            style_config["colors"]["background_color"] = self.bg_color_var.get()
-            style_config["colors"]["text_color"] = self.text_color_var.get()
-            style_config["colors"]["ok_color"] = self.ok_color_var.get()
-            style_config["colors"]["ng_color"] = self.ng_color_var.get()
+            for key, var in self.color_vars.items():
+                style_config["colors"][key] = var.get()
             
             # Salvar configurações de HUD e Inspeção
             style_config["hud_font_size"] = self.hud_font_size_var.get()
@@ -2835,18 +3922,14 @@ class SystemConfigDialog(Toplevel):
             style_config["show_timestamp"] = self.show_timestamp_var.get()
             
             # Salvar no arquivo de configuração de estilo
-            save_style_config(style_config)
+            if save_style_config(style_config):
+                self.style_config = style_config
             
             # Aplicar as configurações de estilo imediatamente
             apply_style_config(style_config)
             
             self.result = True
             messagebox.showinfo("Sucesso", "Configurações salvas com sucesso!")
-            # Desvincular o evento de rolagem do mouse antes de fechar
-            try:
-                self.unbind_all("<MouseWheel>")
-            except:
-                pass
             self.destroy()
             
         except Exception as e:
@@ -2863,27 +3946,23 @@ class SystemConfigDialog(Toplevel):
         self.thr_corr_var.set(0.1)
         self.min_px_var.set(10)
         
-        # Atualiza labels
-        self.features_label.config(text="5000")
-        self.scale_label.config(text="1.20")
-        self.corr_label.config(text="0.10")
+        # Atualiza labels (só existem se a aba já foi construída)
+        if hasattr(self, 'features_label'):
+            self.features_label.config(text="5000")
+            self.scale_label.config(text="1.20")
+        if hasattr(self, 'corr_label'):
+            self.corr_label.config(text="0.10")
         
         # Restaura configurações de estilo
         self.slot_font_size_var.set(10)
         self.result_font_size_var.set(10)
         self.button_font_size_var.set(9)
-        self.bg_color_var.set(get_color('colors.background_color'))
-        self.text_color_var.set(get_color('colors.text_color'))
-        self.ok_color_var.set(get_color('colors.ok_color'))
-        self.ng_color_var.set(get_color('colors.ng_color'))
+        current_config = load_style_config()
+        for key, var in self.color_vars.items():
+            var.set(get_color(f'colors.{key}', current_config))
     
     def cancel(self):
         """Cancela a edição"""
-        # Desvincular o evento de rolagem do mouse antes de fechar
-        try:
-            self.unbind_all("<MouseWheel>")
-        except:
-            pass
         self.destroy()
 
 
@@ -2892,6 +3971,11 @@ class MontagemWindow(ttk.Frame):
         super().__init__(master)
         self.master = master
         
+        # Configuração de estilo em memória e cache das cores já resolvidas
+        # (get_color sem config relê o arquivo JSON a cada chamada)
+        self.style_config = load_style_config()
+        self._color_cache = {}
+        
         # Inicializa o gerenciador de banco de dados
         # Usa caminho absoluto baseado na raiz do projeto
         db_path = MODEL_DIR / "models.db"
@@ -2929,6 +4013,15 @@ class MontagemWindow(ttk.Frame):
         self.live_view = False
         self.latest_frame = None
         
+        # Buffer duplo da captura em segundo plano: a thread só decodifica um frame
+        # (retrieve) quando alguém o pede via get_latest_frame. Os pedidos são numerados:
+        # um frame só atende o pedido se o grab() começou depois dele
+        self._frame_bufs = [None, None]
+        self._frame_idx = 0
+        self._frame_request_seq = 0
+        self._frame_served_seq = 0
+        self._frame_cond = threading.Condition()
+        
         # Variáveis de ferramentas de edição
         self.current_drawing_mode = "rectangle"
         self.editing_handle = None
@@ -2937,93 +4030,88 @@ class MontagemWindow(ttk.Frame):
         self.setup_ui()
         self.update_button_states()
         
-        # Inicia câmera em segundo plano após inicialização completa
+        # Inicia câmera em segundo plano assim que a janela for exibida e estiver ociosa
         if self.available_cameras:
-            self.after(500, lambda: self.start_background_camera_direct(self.available_cameras[0]))
+            self._first_map_id = self.bind("<Map>", self._on_first_map, add="+")
         
         # Inicia limpeza automática de câmeras em cache
         schedule_camera_cleanup(self.master)
     
+    def _color(self, key):
+        """Retorna a cor de `key` da configuração em memória, memoizada até a próxima mudança de estilo."""
+        value = self._color_cache.get(key)
+        if value is None:
+            value = get_color(key, self.style_config)
+            self._color_cache[key] = value
+        return value
+    
     def configure_modern_styles(self):
-        """Configura estilos modernos para a interface."""
+        """
+        Configura estilos modernos para a interface. Todos os estilos vão em um único
+        theme_settings (um script Tcl) em vez de uma chamada configure/map por estilo.
+        """
         style = ttk.Style()
         
-        # Estilo para frames principais
-        style.configure("Modern.TFrame", 
-                       background=get_color('colors.dialog_colors.frame_bg'),
-                       relief="flat")
-        
-        # Estilo para cards/painéis
-        style.configure("Card.TFrame",
-                       background=get_color('colors.dialog_colors.left_panel_bg'),
-                       relief="flat",
-                       borderwidth=1)
-        
-        # Estilo para painel principal do canvas
-        style.configure("Canvas.TFrame",
-                       background=get_color('colors.dialog_colors.center_panel_bg'),
-                       relief="flat")
-        
-        # Estilo para painel direito
-        style.configure("RightPanel.TFrame",
-                       background=get_color('colors.dialog_colors.right_panel_bg'),
-                       relief="flat")
-        
-        # Estilo para botões modernos
-        style.configure("Modern.TButton",
-                       background=get_color('colors.button_colors.modern_bg'),
-                       foreground="white",
-                       borderwidth=0,
-                       focuscolor="none",
-                       padding=(12, 8))
-        
-        style.map("Modern.TButton",
-                 background=[("active", get_color('colors.button_colors.modern_active')),
-                       ("pressed", get_color('colors.button_colors.modern_pressed'))])
-        
-        # Estilo para botões de sucesso
-        style.configure("Success.TButton",
-                       background=get_color('colors.button_colors.success_bg'),
-                       foreground="white",
-                       borderwidth=0,
-                       focuscolor="none",
-                       padding=(12, 8))
-        
-        style.map("Success.TButton",
-                 background=[("active", get_color('colors.button_colors.success_active')),
-                       ("pressed", get_color('colors.button_colors.success_pressed'))])
-        
-        # Estilo para botões de perigo
-        style.configure("Danger.TButton",
-                       background=get_color('colors.button_colors.danger_bg'),
-                       foreground="white",
-                       borderwidth=0,
-                       focuscolor="none",
-                       padding=(12, 8))
-        
-        style.map("Danger.TButton",
-                 background=[("active", get_color('colors.button_colors.danger_active')),
-                       ("pressed", get_color('colors.button_colors.danger_pressed'))])
-        
-        # Estilo para labels modernos
-        style.configure("Modern.TLabel",
-                       background=get_color('colors.dialog_colors.listbox_bg'),
-            foreground=get_color('colors.dialog_colors.listbox_fg'),
-                       font=("Segoe UI", 10))
-        
-        # Estilo para LabelFrames modernos
-        style.configure("Modern.TLabelframe",
-                       background=get_color('colors.dialog_colors.listbox_bg'),
-            foreground=get_color('colors.dialog_colors.listbox_fg'),
-                       borderwidth=1,
-                       relief="solid",
-                       labelmargins=(10, 5, 10, 5))
-        
-        style.configure("Modern.TLabelframe.Label",
-                       background=get_color('colors.dialog_colors.listbox_bg'),
-            foreground=get_color('colors.dialog_colors.listbox_fg'),
-                       font=("Segoe UI", 10, "bold"))
+        button_base = {"foreground": "white", "borderwidth": 0, "focuscolor": "none", "padding": (12, 8)}
+        settings = {
+            # Estilo para frames principais
+            "Modern.TFrame": {"configure": {
+                "background": self._color('colors.dialog_colors.frame_bg'),
+                "relief": "flat"}},
+            
+            # Estilo para cards/painéis
+            "Card.TFrame": {"configure": {
+                "background": self._color('colors.dialog_colors.left_panel_bg'),
+                "relief": "flat",
+                "borderwidth": 1}},
+            
+            # Estilo para painel principal do canvas
+            "Canvas.TFrame": {"configure": {
+                "background": self._color('colors.dialog_colors.center_panel_bg'),
+                "relief": "flat"}},
+            
+            # Estilo para painel direito
+            "RightPanel.TFrame": {"configure": {
+                "background": self._color('colors.dialog_colors.right_panel_bg'),
+                "relief": "flat"}},
+            
+            # Estilo para labels modernos
+            "Modern.TLabel": {"configure": {
+                "background": self._color('colors.dialog_colors.listbox_bg'),
+                "foreground": self._color('colors.dialog_colors.listbox_fg'),
+                "font": ("Segoe UI", 10)}},
+            
+            # Estilo para LabelFrames modernos
+            "Modern.TLabelframe": {"configure": {
+                "background": self._color('colors.dialog_colors.listbox_bg'),
+                "foreground": self._color('colors.dialog_colors.listbox_fg'),
+                "borderwidth": 1,
+                "relief": "solid",
+                "labelmargins": (10, 5, 10, 5)}},
+            
+            "Modern.TLabelframe.Label": {"configure": {
+                "background": self._color('colors.dialog_colors.listbox_bg'),
+                "foreground": self._color('colors.dialog_colors.listbox_fg'),
+                "font": ("Segoe UI", 10, "bold")}},
+        }
+        
+        # Estilos de botão moderno, de sucesso e de perigo
+        for style_name, prefix in (("Modern.TButton", "modern"),
+                                   ("Success.TButton", "success"),
+                                   ("Danger.TButton", "danger")):
+            settings[style_name] = {
+                "configure": dict(button_base, background=self._color(f'colors.button_colors.{prefix}_bg')),
+                "map": {"background": [("active", self._color(f'colors.button_colors.{prefix}_active')),
+                                       ("pressed", self._color(f'colors.button_colors.{prefix}_pressed'))]},
+            }
+        
+        style.theme_settings(style.theme_use(), settings)
         
+    def _on_first_map(self, event=None):
+        """Na primeira exibição da janela, abre a câmera no próximo ciclo ocioso."""
+        self.unbind("<Map>", self._first_map_id)
+        self.after_idle(self.start_background_camera_direct, self.available_cameras[0])
+    
     def start_background_camera_direct(self, camera_index):
         """Inicia a câmera diretamente em segundo plano com índice específico."""
         try:
@@ -3033,11 +4121,11 @@ class MontagemWindow(ttk.Frame):
             
             # Configurações otimizadas para inicialização mais rápida
             if is_windows:
-                self.camera = cv2.VideoCapture(camera_index, cv2.CAP_DSHOW)
+                self.camera = open_windows_camera(camera_index)
             else:
                 self.camera = cv2.VideoCapture(camera_index)
             
-            if not self.camera.isOpened():
+            if self.camera is None or not self.camera.isOpened():
                 raise ValueError(f"Não foi possível abrir a câmera {camera_index}")
             
             # Configurações otimizadas para performance
@@ -3063,23 +4151,61 @@ class MontagemWindow(ttk.Frame):
     
     
     def start_background_frame_capture(self):
-        """Inicia captura de frames em segundo plano sem exibir no canvas."""
+        """
+        Inicia captura de frames em segundo plano sem exibir no canvas.
+        O loop só faz grab() (mantém o buffer do driver atualizado, sem decodificar);
+        o frame é decodificado direto no buffer de trás apenas quando pedido por
+        get_latest_frame (ou enquanto ainda não há nenhum frame), e os buffers são
+        trocados sob o lock.
+        """
         def capture_loop():
             while self.live_capture and self.camera and self.camera.isOpened():
                 try:
-                    ret, frame = self.camera.read()
-                    if ret:
-                        self.latest_frame = frame.copy()
-                    time.sleep(0.033)  # ~30 FPS
+                    # Pedido pendente lido antes do grab(): o frame capturado é posterior a ele
+                    request_seq = self._frame_request_seq
+                    # grab() bloqueia no ritmo do driver (CAP_PROP_BUFFERSIZE=1); só dorme se falhar
+                    if not self.camera.grab():
+                        time.sleep(0.005)
+                        continue
+                    if request_seq > self._frame_served_seq or self.latest_frame is None:
+                        back = 1 - self._frame_idx
+                        ret, frame = self.camera.retrieve(self._frame_bufs[back])
+                        if ret:
+                            with self._frame_cond:
+                                # retrieve devolve um array novo se o buffer não servir (1º frame)
+                                self._frame_bufs[back] = frame
+                                self._frame_idx = back
+                                self.latest_frame = frame
+                                self._frame_served_seq = max(self._frame_served_seq, request_seq)
+                                self._frame_cond.notify_all()
                 except Exception as e:
                     print(f"Erro na captura em segundo plano: {e}")
                     break
         
         # Inicia thread para captura contínua
-        import threading
+        self._frame_bufs = [None, None]
+        self._frame_served_seq = self._frame_request_seq
         self.background_thread = threading.Thread(target=capture_loop, daemon=True)
         self.background_thread.start()
     
+    def get_latest_frame(self, timeout=0.15):
+        """
+        Retorna o frame mais recente da câmera. Com a captura em segundo plano ativa,
+        pede um frame capturado depois do pedido e aguarda no máximo `timeout` segundos
+        (chamado na thread do Tk, então a espera é curta, ~2 frames a 15 fps); se ele
+        não chegar a tempo, retorna None em vez de um frame antigo.
+        O array é o buffer da captura (sem cópia): copie-o se for mantê-lo.
+        """
+        thread = getattr(self, 'background_thread', None)
+        if thread is None or not thread.is_alive():
+            return self.latest_frame
+        with self._frame_cond:
+            self._frame_request_seq += 1
+            seq = self._frame_request_seq
+            if not self._frame_cond.wait_for(lambda: self._frame_served_seq >= seq, timeout):
+                return None
+            return self.latest_frame
+    
     def mark_model_modified(self):
         """Marca o modelo como modificado e atualiza o status."""
         if not self.model_modified:
@@ -3195,13 +4321,14 @@ class MontagemWindow(ttk.Frame):
         
         # Configurando estilo moderno para os botões de rádio
         self.style = ttk.Style()
-        self.style.configure("Modern.TRadiobutton", 
-                           background=get_color('colors.dialog_colors.listbox_bg'),
-            foreground=get_color('colors.dialog_colors.listbox_fg'),
-                           font=("Segoe UI", 9))
-        self.style.map("Modern.TRadiobutton",
-                      background=[('active', get_color('colors.dialog_colors.listbox_active_bg')), ('selected', get_color('colors.dialog_colors.listbox_select_bg'))],
-                      foreground=[('active', 'white'), ('selected', 'white')])
+        self.style.theme_settings(self.style.theme_use(), {"Modern.TRadiobutton": {
+            "configure": {"background": self._color('colors.dialog_colors.listbox_bg'),
+                          "foreground": self._color('colors.dialog_colors.listbox_fg'),
+                          "font": ("Segoe UI", 9)},
+            "map": {"background": [('active', self._color('colors.dialog_colors.listbox_active_bg')),
+                                   ('selected', self._color('colors.dialog_colors.listbox_select_bg'))],
+                    "foreground": [('active', 'white'), ('selected', 'white')]},
+        }})
         
         self.btn_rect_mode = ttk.Radiobutton(mode_buttons_frame, text="📐 Retângulo", 
                                            variable=self.drawing_mode, value="rectangle",
@@ -3219,8 +4346,8 @@ class MontagemWindow(ttk.Frame):
         self.tool_status_var = StringVar(value="🔧 Modo: Retângulo")
         status_label = ttk.Label(tools_frame, textvariable=self.tool_status_var, 
                                font=("Segoe UI", 8), 
-                               foreground=get_color('colors.status_colors.muted_text'),
-            background=get_color('colors.dialog_colors.listbox_bg'))
+                               foreground=self._color('colors.status_colors.muted_text'),
+            background=self._color('colors.dialog_colors.listbox_bg'))
         status_label.pack(padx=10, pady=(0, 8))
         
         # Seção de Slots com design moderno
@@ -3287,7 +4414,7 @@ class MontagemWindow(ttk.Frame):
         
         # Canvas com design moderno
         self.canvas = Canvas(canvas_container, 
-                           bg=get_color('colors.canvas_colors.modern_bg'),  # Cor de fundo moderna
+                           bg=self._color('colors.canvas_colors.modern_bg'),  # Cor de fundo moderna
                            highlightthickness=0,
                            relief="flat",
                            yscrollcommand=v_scrollbar.set,
@@ -3386,10 +4513,10 @@ class MontagemWindow(ttk.Frame):
             import platform
             is_windows = platform.system() == 'Windows'
             if is_windows:
-                self.camera = cv2.VideoCapture(camera_index, cv2.CAP_DSHOW)
+                self.camera = open_windows_camera(camera_index)
             else:
                 self.camera = cv2.VideoCapture(camera_index)
-            if not self.camera.isOpened():
+            if self.camera is None or not self.camera.isOpened():
                 raise ValueError(f"Não foi possível abrir a câmera {camera_index}")
             self.camera.set(cv2.CAP_PROP_BUFFERSIZE, 1)
             self.camera.set(cv2.CAP_PROP_FPS, 30)
@@ -3526,11 +4653,11 @@ class MontagemWindow(ttk.Frame):
             
             # Configurações otimizadas para inicialização mais rápida
             if is_windows:
-                self.camera = cv2.VideoCapture(camera_index, cv2.CAP_DSHOW)
+                self.camera = open_windows_camera(camera_index)
             else:
                 self.camera = cv2.VideoCapture(camera_index)
             
-            if not self.camera.isOpened():
+            if self.camera is None or not self.camera.isOpened():
                 raise ValueError(f"Não foi possível abrir a câmera {camera_index}")
             
             # Configurações otimizadas para performance
@@ -3652,14 +4779,14 @@ class MontagemWindow(ttk.Frame):
             is_windows = platform.system() == 'Windows'
             
             # Configurações otimizadas para inicialização mais rápida
-            # Usa DirectShow no Windows para melhor compatibilidade
+            # No Windows usa o mesmo backend das demais aberturas
             # No Raspberry Pi, usa a API padrão
             if is_windows:
-                self.camera = cv2.VideoCapture(camera_index, cv2.CAP_DSHOW)
+                self.camera = open_windows_camera(camera_index)
             else:
                 self.camera = cv2.VideoCapture(camera_index)
             
-            if not self.camera.isOpened():
+            if self.camera is None or not self.camera.isOpened():
                 raise ValueError(f"Não foi possível abrir a câmera {camera_index}")
             
             # Configurações otimizadas para performance e inicialização rápida
@@ -3727,14 +4854,19 @@ class MontagemWindow(ttk.Frame):
     def capture_from_webcam(self):
         """Captura instantânea da imagem mais recente da câmera."""
         try:
-            if not self.live_capture or self.latest_frame is None:
+            latest_frame = self.get_latest_frame() if self.live_capture else None
+            if latest_frame is None and self.live_capture:
+                # A câmera já está aberta pela captura contínua: não abre o dispositivo de novo
+                self.status_var.set("Nenhum frame da câmera ainda, tente novamente")
+                return
+            if latest_frame is None:
                 # Fallback para captura única se não há captura contínua
                 camera_index = int(self.camera_combo.get()) if self.camera_combo.get() else 0
                 # Usa cache de câmera para evitar reinicializações
                 captured_image = capture_image_from_camera(camera_index, use_cache=True)
             else:
                 # Usa o frame mais recente da captura contínua
-                captured_image = self.latest_frame.copy()
+                captured_image = latest_frame.copy()
             
             if captured_image is not None:
                 # Limpa dados anteriores
@@ -3936,15 +5068,15 @@ class MontagemWindow(ttk.Frame):
             center_x = (x1 + x2) / 2
             center_y = (y1 + y2) / 2
             
-            # Carrega as configurações de estilo
-            style_config = load_style_config()
+            # Configurações de estilo já carregadas em memória
+            style_config = self.style_config
             
             # Escolhe cor baseada na seleção
             if slot['id'] == self.selected_slot_id:
-                color = get_color('colors.selection_color', style_config)
+                color = self._color('colors.selection_color')
                 width = 3
             else:
-                color = get_color('colors.editor_colors.clip_color')
+                color = self._color('colors.editor_colors.clip_color')
                 width = 2
             
             # Obtém rotação do slot
@@ -3962,11 +5094,9 @@ class MontagemWindow(ttk.Frame):
                 
                 # Desenha área de exclusão em vermelho
                 self.canvas.create_rectangle(ex_x1, ex_y1, ex_x2, ex_y2,
-                                            outline=get_color('colors.editor_colors.delete_color'), width=2, tags="slot")
+                                            outline=self._color('colors.editor_colors.delete_color'), width=2, tags="slot")
             
             # Adiciona texto com ID (já usando x1, y1 corrigidos com offsets)
-            # Carrega as configurações de estilo
-            style_config = load_style_config()
             self.canvas.create_text(x1 + 5, y1 + 5, text=slot['id'],
                                    fill="white", font=style_config["ok_font"], tags="slot")
             
@@ -3978,13 +5108,10 @@ class MontagemWindow(ttk.Frame):
             edit_y2 = y1 + edit_size + 2
             
             edit_btn = self.canvas.create_rectangle(edit_x1, edit_y1, edit_x2, edit_y2,
-                                                   fill=get_color('colors.inspection_colors.pass_color'), outline=get_color('colors.special_colors.white_text'), width=1,
+                                                   fill=self._color('colors.inspection_colors.pass_color'), outline=self._color('colors.special_colors.white_text'), width=1,
                                                    tags=("slot", f"edit_btn_{slot['id']}"))
             
             # Adiciona ícone de edição (pequeno "E")
-            # Carrega as configurações de estilo se ainda não foi carregado
-            if 'style_config' not in locals():
-                style_config = load_style_config()
             self.canvas.create_text((edit_x1 + edit_x2) // 2, (edit_y1 + edit_y2) // 2,
                                    text="E", fill="white", font=style_config["ok_font"],
                                    tags=("slot", f"edit_text_{slot['id']}"))
@@ -4145,9 +5272,9 @@ class MontagemWindow(ttk.Frame):
         
         # Define cor baseada no modo
         if self.current_drawing_mode == "exclusion":
-            outline_color = get_color('colors.editor_colors.delete_color')  # Vermelho para exclusão
+            outline_color = self._color('colors.editor_colors.delete_color')  # Vermelho para exclusão
         else:
-            outline_color = get_color('colors.editor_colors.drawing_color')
+            outline_color = self._color('colors.editor_colors.drawing_color')
         
         # Desenha retângulo (para rectangle e exclusion)
         self.current_rect = self.canvas.create_rectangle(
@@ -4613,7 +5740,7 @@ class MontagemWindow(ttk.Frame):
             entry.pack(side='left', padx=(5, 0))
             
             # Tooltip simples
-            tip_label = ttk.Label(row_frame, text=tooltip, font=get_font('tiny_font'), foreground=get_color('colors.special_colors.tooltip_fg'))
+            tip_label = ttk.Label(row_frame, text=tooltip, font=get_font('tiny_font'), foreground=self._color('colors.special_colors.tooltip_fg'))
             tip_label.pack(side='left', padx=(5, 0))
         
         # Seção: Detecção (para slots do tipo clip)
@@ -4643,7 +5770,7 @@ class MontagemWindow(ttk.Frame):
             
             # Tooltip para explicar cada método
             method_tip = ttk.Label(method_frame, text="Selecione o método de detecção", 
-                                  font=get_font('tiny_font'), foreground=get_color('colors.special_colors.tooltip_fg'))
+                                  font=get_font('tiny_font'), foreground=self._color('colors.special_colors.tooltip_fg'))
             method_tip.pack(side='left', padx=(5, 0))
             
             # Atualiza o tooltip baseado na seleção
@@ -4666,7 +5793,7 @@ class MontagemWindow(ttk.Frame):
             preview_frame.pack(fill='x', pady=5, padx=5)
             
             # Canvas para exibir o preview
-            self.preview_canvas = Canvas(preview_frame, bg=get_color('colors.special_colors.preview_canvas_bg'), width=200, height=150)
+            self.preview_canvas = Canvas(preview_frame, bg=self._color('colors.special_colors.preview_canvas_bg'), width=200, height=150)
             self.preview_canvas.pack(fill='both', expand=True, padx=5, pady=5)
             
             # Definir variáveis antes da função update_preview_filter
@@ -4821,7 +5948,7 @@ class MontagemWindow(ttk.Frame):
             threshold_var.trace("w", update_preview_filter)
             
             threshold_tip = ttk.Label(threshold_frame, text="Valor entre 0.0 e 1.0", 
-                                    font=get_font('tiny_font'), foreground=get_color('colors.special_colors.tooltip_fg'))
+                                    font=get_font('tiny_font'), foreground=self._color('colors.special_colors.tooltip_fg'))
             threshold_tip.pack(side='left', padx=(5, 0))
             
             # Porcentagem para OK
@@ -4839,7 +5966,7 @@ class MontagemWindow(ttk.Frame):
             ok_threshold_var.trace("w", update_preview_filter)
             
             ok_threshold_tip = ttk.Label(ok_threshold_frame, text="Porcentagem para considerar OK (0-100)", 
-                                       font=get_font('tiny_font'), foreground=get_color('colors.special_colors.tooltip_fg'))
+                                       font=get_font('tiny_font'), foreground=self._color('colors.special_colors.tooltip_fg'))
             ok_threshold_tip.pack(side='left', padx=(5, 0))
             
             # Limiar de correlação
@@ -4858,7 +5985,7 @@ class MontagemWindow(ttk.Frame):
             correlation_threshold_var.trace("w", update_preview_filter)
             
             correlation_threshold_tip = ttk.Label(correlation_threshold_frame, text="Limiar de correlação (0.0-1.0)", 
-                                                 font=get_font('tiny_font'), foreground=get_color('colors.special_colors.tooltip_fg'))
+                                                 font=get_font('tiny_font'), foreground=self._color('colors.special_colors.tooltip_fg'))
             correlation_threshold_tip.pack(side='left', padx=(5, 0))
         
         # Botões de ação
@@ -5442,7 +6569,7 @@ class MontagemWindow(ttk.Frame):
         h = slot['h'] * self.scale_factor
         
         handle_size = 8
-        handle_color = get_color('colors.editor_colors.handle_color')
+        handle_color = self._color('colors.editor_colors.handle_color')
         
         # Handles de redimensionamento (cantos e meio das bordas)
         handles = [
@@ -5689,7 +6816,7 @@ class MontagemWindow(ttk.Frame):
         
         # Texto
         text_widget = Text(text_frame, wrap="word", yscrollcommand=scrollbar.set,
-                          font=get_font('console_font'), bg=get_color('colors.special_colors.console_bg'), fg=get_color('colors.special_colors.console_fg'))
+                          font=get_font('console_font'), bg=self._color('colors.special_colors.console_bg'), fg=self._color('colors.special_colors.console_fg'))
         text_widget.pack(side=LEFT, fill=BOTH, expand=True)
         scrollbar.config(command=text_widget.yview)
         
@@ -5711,6 +6838,11 @@ class MontagemWindow(ttk.Frame):
         """Abre a janela de configuração do sistema."""
         config_dialog = SystemConfigDialog(self.master)
         config_dialog.wait_window()
+        
+        # Cores salvas pelo diálogo invalidam o cache
+        if config_dialog.result:
+            self.style_config = config_dialog.style_config
+            self._color_cache.clear()
     
     def set_drawing_mode(self):
         """Define o modo de desenho atual."""
@@ -5784,11 +6916,11 @@ class InspecaoWindow(ttk.Frame):
             
             # Configurações otimizadas para inicialização mais rápida
             if is_windows:
-                self.camera = cv2.VideoCapture(camera_index, cv2.CAP_DSHOW)
+                self.camera = open_windows_camera(camera_index)
             else:
                 self.camera = cv2.VideoCapture(camera_index)
             
-            if not self.camera.isOpened():
+            if self.camera is None or not self.camera.isOpened():
                 raise ValueError(f"Não foi possível abrir a câmera {camera_index}")
             
             # Configurações otimizadas para performance
@@ -6303,14 +7435,14 @@ class InspecaoWindow(ttk.Frame):
             is_windows = platform.system() == 'Windows'
             
             # Configurações otimizadas para inicialização mais rápida
-            # Usa DirectShow no Windows para melhor compatibilidade
+            # No Windows usa o mesmo backend das demais aberturas
             # No Raspberry Pi, usa a API padrão
             if is_windows:
-                self.camera = cv2.VideoCapture(camera_index, cv2.CAP_DSHOW)
+                self.camera = open_windows_camera(camera_index)
             else:
                 self.camera = cv2.VideoCapture(camera_index)
             
-            if not self.camera.isOpened():
+            if self.camera is None or not self.camera.isOpened():
                 raise ValueError(f"Não foi possível abrir a câmera {camera_index}")
             
             # Configurações otimizadas para performance e inicialização rápida
@@ -6446,13 +7578,13 @@ class InspecaoWindow(ttk.Frame):
             is_windows = platform.system() == 'Windows'
             
             # Configurações otimizadas para inicialização mais rápida
-            # Usa DirectShow no Windows para melhor compatibilidade
+            # No Windows usa o mesmo backend das demais aberturas
             if is_windows:
-                self.camera = cv2.VideoCapture(camera_index, cv2.CAP_DSHOW)
+                self.camera = open_windows_camera(camera_index)
             else:
                 self.camera = cv2.VideoCapture(camera_index)
             
-            if not self.camera.isOpened():
+            if self.camera is None or not self.camera.isOpened():
                 raise ValueError(f"Não foi possível abrir a câmera {camera_index}")
             
             # Configurações otimizadas para performance e inicialização rápida
@@ -7073,7 +8205,9 @@ class InspecaoWindow(ttk.Frame):
             
             # Converte a imagem para o tamanho do canvas
             try:
-                self.img_display, self.scale_factor = cv2_to_tk(self.img_test, max_w=canvas_width, max_h=canvas_height)
+                # Reaproveita o PhotoImage do canvas entre frames (atualiza pixels in-place)
+                self.img_display, self.scale_factor = cv2_to_tk(self.img_test, max_w=canvas_width, max_h=canvas_height,
+                                                                photo_key=str(self.canvas))
             except Exception as convert_error:
                 print(f"Erro ao converter imagem para exibição: {convert_error}")
                 return
@@ -7162,7 +8296,11 @@ class InspecaoWindow(ttk.Frame):
                     self.inspection_status_var.set("ALINHANDO...")
                 if hasattr(self, 'update_idletasks'):
                     self.update_idletasks()  # Força atualização da UI
-                M, _, align_error = find_image_transform(self.img_reference, self.img_test)
+                # Converte o frame de teste para cinza uma única vez: o mesmo array serve
+                # ao alinhamento e a todos os slots (as ROIs em cinza são fatias dele)
+                img_test = self.img_test
+                gray_test = cv2.cvtColor(img_test, cv2.COLOR_BGR2GRAY) if img_test.ndim == 3 else img_test
+                M, _, align_error = find_image_transform(self.img_reference, img_test, gray_test)
             except Exception as e:
                 print(f"Erro durante alinhamento: {e}")
                 if hasattr(self, 'inspection_status_var'):
@@ -7220,7 +8358,11 @@ class InspecaoWindow(ttk.Frame):
                 # Adicionar modelo_id aos resultados se disponível
                 model_id = getattr(self, 'current_model_id', '--')
                 
-                for i, slot in enumerate(self.slots):
+                # Dispara a verificação de todos os slots em paralelo; a UI (Tk) continua
+                # sendo atualizada apenas nesta thread, na ordem original dos slots
+                futures = [_SLOT_POOL.submit(check_slot, img_test, slot, M, gray_test) for slot in self.slots]
+                
+                for i, (slot, future) in enumerate(zip(self.slots, futures)):
                     # Atualizar status com progresso
                     progress = f"SLOT {i+1}/{len(self.slots)}"
                     if hasattr(self, 'inspection_status_var'):
@@ -7230,7 +8372,7 @@ class InspecaoWindow(ttk.Frame):
                     
                     try:
                         # Processamento otimizado sem logs excessivos
-                        is_ok, correlation, pixels, corners, bbox, log_msgs = check_slot(self.img_test, slot, M)
+                        is_ok, correlation, pixels, corners, bbox, log_msgs = future.result()
                         
                         # Log apenas para falhas (reduz overhead)
                         if not is_ok:
@@ -7763,10 +8905,12 @@ class InspecaoWindow(ttk.Frame):
         def capture_frames():
             while self.live_capture and self.camera and self.camera.isOpened():
                 try:
+                    # read() bloqueia no ritmo do driver (CAP_PROP_BUFFERSIZE=1); só dorme se falhar
                     ret, frame = self.camera.read()
                     if ret:
                         self.latest_frame = frame.copy()
-                    time.sleep(0.033)  # ~30 FPS
+                    else:
+                        time.sleep(0.005)
                 except Exception as e:
                     print(f"Erro na captura de frame: {e}")
                     break
@@ -7801,13 +8945,15 @@ def create_main_window():
     
     # Configura fechamento de janelas OpenCV
     def on_closing():
-        cv2.destroyAllWindows()
+        post_display_command('close_all')
         # Limpa cache de câmeras antes de fechar
         try:
             release_all_cached_cameras()
             print("Cache de câmeras limpo ao fechar aplicação principal")
         except Exception as e:
             print(f"Erro ao limpar cache de câmeras na aplicação principal: {e}")
+        # Conclui a gravação das amostras de treinamento ainda na fila (thread daemon)
+        wait_pending_sample_saves()
         root.destroy()
     
     root.protocol("WM_DELETE_WINDOW", on_closing)
@@ -8417,10 +9563,12 @@ class HistoricoFotosWindow(ttk.Frame):
         def capture_frames():
             while self.live_capture and self.camera and self.camera.isOpened():
                 try:
+                    # read() bloqueia no ritmo do driver (CAP_PROP_BUFFERSIZE=1); só dorme se falhar
                     ret, frame = self.camera.read()
                     if ret:
                         self.latest_frame = frame.copy()
-                    time.sleep(0.033)  # ~30 FPS
+                    else:
+                        time.sleep(0.005)
                 except Exception as e:
                     print(f"Erro na captura de frame: {e}")
                     break